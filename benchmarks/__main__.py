@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+
+DEFAULT_OUTPUT = "./data/bench/results.json"
+DEFAULT_BASELINE = "./data/bench/baseline.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="offline microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", help="run only benchmarks whose name contains this substring")
+    parser.add_argument("--with-model", action="store_true", help="include benchmarks that load the classifier")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    from . import cases  # noqa: F401 - registers benchmarks
+    from .harness import run_benchmarks, save_results, load_results, compare
+
+    results = run_benchmarks(args.iterations, only=args.only, with_model=args.with_model)
+    for r in results:
+        extra = f"  {r.extra}" if r.extra else ""
+        print(f"{r.name:<40} median {r.median_us:>12.1f}us  min {r.min_us:>12.1f}us  n={r.iterations}{extra}")
+
+    save_results(results, args.output)
+    print(f"results saved to {args.output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, skipping comparison")
+        return 0
+
+    regressions = compare(results, load_results(args.baseline), args.threshold)
+    for name, base, current, ratio in regressions:
+        print(f"REGRESSION {name}: {base:.1f}us -> {current:.1f}us ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"no regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import tracemalloc
+
+from src.catalog import CardCatalog
+from src.interactor import Interactor
+from src.models import ActionMode, CardRecord, ParsedMessage, Rarity, strings
+from src.parser import clean_text, parse_message, parse_stats
+from src.records import from_parsed
+from src.shop import ShopManager
+from src.sim import samples
+from src.sim.fake_client import FakeClient
+from src.sim.fake_komaru import FakeKomaruCardsBot
+from src.utils import get_message_text, remove_formatting, set_delay_scale
+
+from .harness import benchmark, measure, measure_async
+
+
+def make_fake_session(**bot_kwargs) -> tuple[FakeClient, FakeKomaruCardsBot, Interactor]:
+    client = FakeClient()
+    fake_bot = FakeKomaruCardsBot(client, **bot_kwargs)
+    interactor = Interactor(client, {"target_bot_id": client.bot.id, "outbound": {"rate_per_minute": 0}})
+    return client, fake_bot, interactor
+
+
+@benchmark("remove_formatting")
+def bench_remove_formatting(iterations: int):
+    return [
+        measure("remove_formatting.plain", lambda: remove_formatting(samples.NEW_CARD), iterations * 10),
+        measure("remove_formatting.formatted", lambda: remove_formatting(samples.FORMATTED_NEW_CARD), iterations * 10),
+    ]
+
+
+def _utf16_len(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _entity(entity_type, text: str, fragment: str):
+    start = text.index(fragment)
+    return entity_type(offset=_utf16_len(text[:start]), length=_utf16_len(fragment))
+
+
+@benchmark("text_extraction")
+def bench_text_extraction(iterations: int):
+    from telethon.extensions import markdown
+    from telethon.tl.types import MessageEntityBold, MessageEntityCode, MessageEntityItalic
+
+    client = FakeClient()
+    texts = [*samples.MESSAGES.values(), samples.NEW_CARD.replace("Комару в", "Комару\u200b в")]
+    messages = [client.make_message(text) for text in texts]
+    formatted = client.make_message(samples.NEW_CARD, formatted_text=samples.FORMATTED_NEW_CARD)
+    formatted.entities = [_entity(MessageEntityBold, samples.NEW_CARD, "«Комару в своем бассейне»"),
+                          _entity(MessageEntityItalic, samples.NEW_CARD, "Редкая"),
+                          _entity(MessageEntityCode, samples.NEW_CARD, "[339,000]")]
+    messages.append(formatted)
+
+    def legacy():
+        return [clean_text(markdown.unparse(msg.raw_text, msg.entities or [])) for msg in messages]
+
+    def uncached():
+        for msg in messages:
+            msg._clean_text = None
+        return [get_message_text(msg) for msg in messages]
+
+    def cached():
+        return [get_message_text(msg) for msg in messages]
+
+    mismatches = [text for text, old, new in zip(texts + [samples.NEW_CARD], legacy(), cached())
+                  if parse_message(old) != parse_message(new)]
+    if mismatches:
+        raise AssertionError(f"text extraction changed parse results for {len(mismatches)} message(s): "
+                             f"{[text[:40] for text in mismatches]}")
+
+    extra = {"messages": len(messages)}
+    return [
+        measure("text_extraction.render_and_strip", legacy, iterations * 10, extra=extra),
+        measure("text_extraction.raw_uncached", uncached, iterations * 10, extra=extra),
+        measure("text_extraction.raw_cached", cached, iterations * 10, extra=extra),
+    ]
+
+
+@benchmark("parse_message")
+def bench_parse_message(iterations: int):
+    catalog = CardCatalog(path=None)
+    catalog.record("Много комару", "Редкая", save=False)
+    results = []
+    for kind, text in samples.MESSAGES.items():
+        model_calls = parse_stats.model_calls
+        result = measure(f"parse_message.{kind}", lambda: parse_message(text, catalog), iterations * 10)
+        result.extra = {"model_calls": parse_stats.model_calls - model_calls}
+        results.append(result)
+    return results
+
+
+@benchmark("predictor", requires_model=True)
+def bench_predictor(iterations: int):
+    from src.nn.predict import Predictor
+    predictor = Predictor()
+    texts = list(samples.MESSAGES.values())
+    results = []
+    for batch_size in (1, 8, 32):
+        batch = (texts * (batch_size // len(texts) + 1))[:batch_size]
+        result = measure(f"predictor.batch_{batch_size}", lambda: predictor.predict(batch), max(3, iterations // 4),
+                         warmup=1)
+        result.extra = {"per_message_us": result.median_us / batch_size}
+        results.append(result)
+    return results
+
+
+@benchmark("interactor")
+async def bench_interactor(iterations: int):
+    set_delay_scale(0)
+    client, _, interactor = make_fake_session()
+    profile_msg = await interactor.execute_action(ActionMode.SEND, message=strings.CMD_PROFILE)
+    return [
+        await measure_async("interactor.send",
+                            lambda: interactor.execute_action(ActionMode.SEND, message=strings.CMD_PROFILE),
+                            iterations),
+        await measure_async("interactor.click",
+                            lambda: interactor.execute_action(ActionMode.CLICK, original_message=profile_msg,
+                                                              button_text=strings.BTN_INVENTORY),
+                            iterations),
+    ]
+
+
+@benchmark("shop")
+async def bench_shop(iterations: int):
+    set_delay_scale(0)
+    _, _, interactor = make_fake_session(boosters={strings.BOOSTER_LUCK: 3, strings.BOOSTER_TIME: 1})
+    shop = ShopManager(interactor)
+    return await measure_async("shop.get_booster_count",
+                               lambda: shop.get_booster_count(strings.BOOSTER_LUCK), iterations)
+
+
+def _allocated_bytes(build) -> tuple[object, int]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, allocated
+
+
+@benchmark("records")
+def bench_records(iterations: int):
+    count = 10000
+    texts = [samples.card_message(f"Комару {i % 500}", "Редкая", 1000 + i, 500 + i, duplicate=i % 3 == 0)
+             for i in range(count)]
+    parsed = [(i, float(i), parse_message(text)) for i, text in enumerate(texts)]
+
+    def as_dicts():
+        return [{"message_id": i, "date": date, "type": p.type, "name": p.record.name,
+                 "rarity": p.record.rarity_label, "total_points": p.record.total_points,
+                 "total_coins": p.record.total_coins, "booster_used": None} for i, date, p in parsed]
+
+    def as_records():
+        return [(i, date, ParsedMessage(type=p.type, record=CardRecord(
+            name=p.record.name, rarity=p.record.rarity, total_points=p.record.total_points,
+            total_coins=p.record.total_coins, rarity_label=p.record.rarity_label))) for i, date, p in parsed]
+
+    _, dict_bytes = _allocated_bytes(as_dicts)
+    _, record_bytes = _allocated_bytes(as_records)
+    records, array_bytes = _allocated_bytes(lambda: from_parsed(parsed))
+
+    def scan_dicts(rows=as_dicts()):
+        return sum(1 for row in rows if row["rarity"] == "Редкая")
+
+    def scan_records(rows=as_records(), rare=Rarity.RARE):
+        return sum(1 for _, _, p in rows if p.record.rarity is rare)
+
+    extra = {"messages": count}
+    return [
+        measure("records.build_dicts", as_dicts, iterations, extra={**extra, "bytes": dict_bytes}),
+        measure("records.build_slotted", as_records, iterations, extra={**extra, "bytes": record_bytes}),
+        measure("records.build_array", lambda: from_parsed(parsed), iterations,
+                extra={**extra, "bytes": array_bytes, "column_bytes": records.nbytes}),
+        measure("records.scan_dicts", scan_dicts, iterations),
+        measure("records.scan_slotted", scan_records, iterations),
+        measure("records.scan_array", records.count_by_rarity, iterations),
+    ]
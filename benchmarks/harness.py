@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import dataclass, asdict
+
+BENCHMARKS = {}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    median_us: float
+    mean_us: float
+    min_us: float
+    max_us: float
+    extra: dict | None = None
+
+
+def benchmark(name: str, requires_model: bool = False):
+    def decorator(func):
+        BENCHMARKS[name] = (func, requires_model)
+        return func
+    return decorator
+
+
+def _result(name: str, samples_ns: list[int], extra: dict | None = None) -> BenchResult:
+    samples_us = [s / 1000 for s in samples_ns]
+    return BenchResult(name=name, iterations=len(samples_us), median_us=statistics.median(samples_us),
+                       mean_us=statistics.fmean(samples_us), min_us=min(samples_us), max_us=max(samples_us),
+                       extra=extra)
+
+
+def measure(name: str, func, iterations: int, warmup: int = 3, extra: dict | None = None) -> BenchResult:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - started)
+    return _result(name, samples, extra)
+
+
+async def measure_async(name: str, coro_func, iterations: int, warmup: int = 1,
+                        extra: dict | None = None) -> BenchResult:
+    for _ in range(warmup):
+        await coro_func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        await coro_func()
+        samples.append(time.perf_counter_ns() - started)
+    return _result(name, samples, extra)
+
+
+def run_benchmarks(iterations: int, only: str | None = None, with_model: bool = False) -> list[BenchResult]:
+    results = []
+    for name, (func, requires_model) in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        if requires_model and not with_model:
+            continue
+        outcome = func(iterations)
+        if asyncio.iscoroutine(outcome):
+            outcome = asyncio.run(outcome)
+        results.extend(outcome if isinstance(outcome, list) else [outcome])
+    return results
+
+
+def save_results(results: list[BenchResult], path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": {r.name: asdict(r) for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: list[BenchResult], baseline: dict, threshold: float) -> list[tuple[str, float, float, float]]:
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base or not base["median_us"]:
+            continue
+        ratio = r.median_us / base["median_us"]
+        if ratio > 1 + threshold:
+            regressions.append((r.name, base["median_us"], r.median_us, ratio))
+    return regressions
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import csv
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict, fields
+
+DEFAULT_OUTPUT = "./data/bench/load.csv"
+
+
+@dataclass
+class LoadResult:
+    bots: int
+    duration_s: float
+    messages: int
+    messages_per_second: float
+    actions: int
+    card_commands: int
+    cards: int
+    wasted_probes: int
+    transitions: int
+    shopping_actions: int
+    time_boosters: int
+    actions_per_card: float
+    execute_p50_ms: float
+    execute_p99_ms: float
+    inference_requests: int
+    inference_batches: int
+    inference_mean_depth: float
+    inference_max_depth: int
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    rss_mb: float
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+def fake_predictor(inference_ms: float):
+    def predict(texts: list[str]) -> list[dict]:
+        time.sleep(inference_ms / 1000 * (1 + 0.1 * (len(texts) - 1)))
+        return [{"type": "new_card", "confidence": 1.0, "message_type": "NEW_CARD"} for _ in texts]
+    return predict
+
+
+def load_config(base: dict, target_bot_id: int, time_booster_chance: float | None = None) -> dict:
+    from src.replay import replay_config
+
+    config = replay_config(base, target_bot_id, mode="automatic")
+    config["behavior"] = {**config.get("behavior", {}), "max_actions_before_rest": 10 ** 9}
+    if time_booster_chance is not None:
+        config["behavior"]["use_time_booster_chance"] = time_booster_chance
+    return config
+
+
+async def run_load(bots: int, duration: float, latency: float | tuple[float, float], cooldown_seconds: int,
+                   headerless_ratio: float, inference_ms: float, with_model: bool, seed: int,
+                   time_booster_chance: float | None = None) -> LoadResult:
+    from bot import KomaruBot
+    from src.account import AccountState
+    from src.config_manager import get_config
+    from src.models import strings
+    from src.monitoring import LoopLagMonitor, current_rss_mb
+    from src.nn.batcher import InferenceBatcher
+    from src.parser import get_predictor
+    from src.sim.fake_client import FakeClient
+    from src.sim.fake_komaru import FakeKomaruCardsBot
+    from src.utils import set_delay_scale
+
+    set_delay_scale(0)
+    base_config = get_config()
+    inference_settings = base_config.get("inference", {})
+    predict = (lambda texts: get_predictor().predict(texts)) if with_model else fake_predictor(inference_ms)
+    batcher = InferenceBatcher(predict, max_batch_size=inference_settings.get("max_batch_size", 16),
+                               max_wait_ms=inference_settings.get("max_wait_ms", 5))
+
+    sessions = []
+    for i in range(bots):
+        client = FakeClient()
+        fake_bot = FakeKomaruCardsBot(client, latency=latency, coins=1000, cooldown_seconds=cooldown_seconds,
+                                      headerless_ratio=headerless_ratio, seed=seed + i)
+        bot = KomaruBot(config=load_config(base_config, client.bot.id, time_booster_chance), app=client)
+        bot.inference = batcher
+        sessions.append((client, bot, fake_bot))
+
+    monitor = LoopLagMonitor(threshold_ms=10 ** 6, report_interval=float("inf"))
+    monitor.start()
+    depth_samples = []
+
+    async def sample_depth():
+        while True:
+            depth_samples.append(batcher.depth)
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_depth())
+    started = time.monotonic()
+    tasks = [asyncio.create_task(bot.start()) for _, bot, _ in sessions]
+    await asyncio.sleep(duration)
+    elapsed = time.monotonic() - started
+
+    messages = sum(client.dispatched for client, _, _ in sessions)
+    latencies = sorted(l * 1000 for _, bot, _ in sessions for l in bot.interactor.latencies)
+    accounts = [bot.account for _, bot, _ in sessions]
+    actions = sum(bot.interactor.actions for _, bot, _ in sessions)
+    cards = sum(account.cards for account in accounts)
+    result = LoadResult(
+        bots=bots, duration_s=round(elapsed, 3), messages=messages,
+        messages_per_second=round(messages / elapsed, 2),
+        actions=actions, card_commands=sum(sum(account.probes.values()) for account in accounts), cards=cards,
+        wasted_probes=sum(sum(account.wasted_probes.values()) for account in accounts),
+        transitions=sum(sum(account.transitions.values()) for account in accounts),
+        shopping_actions=sum(account.actions[AccountState.SHOPPING] for account in accounts),
+        time_boosters=sum(fake_bot.activations[strings.BOOSTER_TIME] for _, _, fake_bot in sessions),
+        actions_per_card=round(actions / cards, 2) if cards else 0.0,
+        execute_p50_ms=round(_percentile(latencies, 0.5), 3), execute_p99_ms=round(_percentile(latencies, 0.99), 3),
+        inference_requests=batcher.requests, inference_batches=batcher.batches,
+        inference_mean_depth=round(statistics.fmean(depth_samples), 3) if depth_samples else 0.0,
+        inference_max_depth=batcher.max_depth,
+        loop_lag_p50_ms=round(monitor.histogram.percentile(0.5), 3),
+        loop_lag_p99_ms=round(monitor.histogram.percentile(0.99), 3),
+        loop_lag_max_ms=round(monitor.histogram.max_ms, 3), rss_mb=round(current_rss_mb(), 1))
+
+    sampler.cancel()
+    monitor.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for _, bot, _ in sessions:
+        await bot.stop()
+    return result
+
+
+def write_csv(results: list[LoadResult], path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=[field.name for field in fields(LoadResult)])
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+
+
+def _parse_latency(value: str) -> float | tuple[float, float]:
+    if ":" in value:
+        low, high = value.split(":", 1)
+        return float(low), float(high)
+    return float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load",
+                                     description="drive many bots against an in-process fake KomaruCardsBot")
+    parser.add_argument("--bots", default="1,5,10,25,50", help="comma-separated bot counts to run")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to drive each bot count")
+    parser.add_argument("--latency", type=_parse_latency, default=0.05,
+                        help="fake bot response latency in seconds, or a min:max range")
+    parser.add_argument("--cooldown", type=int, default=0, help="fake bot cooldown between cards in seconds")
+    parser.add_argument("--time-booster-chance", type=float,
+                        help="override behavior.use_time_booster_chance, e.g. 1.0 with a long --cooldown")
+    parser.add_argument("--headerless-ratio", type=float, default=0.2,
+                        help="share of card messages sent without a header, forcing a classifier call")
+    parser.add_argument("--inference-ms", type=float, default=20.0,
+                        help="simulated classifier latency per batch when --with-model is not set")
+    parser.add_argument("--with-model", action="store_true", help="use the real classifier instead of a simulated one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    from src.logger import logger
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    results = []
+    for bots in (int(n) for n in args.bots.split(",")):
+        result = asyncio.run(run_load(bots, args.duration, args.latency, args.cooldown, args.headerless_ratio,
+                                      args.inference_ms, args.with_model, args.seed, args.time_booster_chance))
+        results.append(result)
+        print(f"{bots:>4} bots: {result.messages_per_second:>8.1f} msg/s  execute_action p50 {result.execute_p50_ms:.1f}ms "
+              f"p99 {result.execute_p99_ms:.1f}ms  inference depth {result.inference_mean_depth:.2f} "
+              f"(max {result.inference_max_depth})  loop lag p99 {result.loop_lag_p99_ms:.0f}ms  "
+              f"rss {result.rss_mb:.0f}MB  {result.actions_per_card:.1f} actions/card "
+              f"({result.wasted_probes} wasted probes, {result.time_boosters} time boosters)")
+
+    write_csv(results, args.output)
+    print(f"results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,81 @@
 import asyncio
 import random
-from enum import Enum, auto
+import signal
+import time
 from telethon import TelegramClient, events
 from src.logger import logger
-from src.parser import parse_message
-from src.models import MessageType, strings, ActionMode
+from src.parser import parse_message_async, parse_card, parse_stats, get_predictor, reload_predictor
+from src.catalog import CardCatalog, DEFAULT_CATALOG_PATH
+from src.models import MessageType, strings, ActionMode, ShopAction, ShopOperation, ActionPriority, BoosterInfo
 from src.shop import ShopManager
 from src.interactor import Interactor
 from src.utils import get_message_text, human_delay
 from src.config_manager import get_config
-
-
-class BotState(Enum):
-    ACTIVE = auto()
-    SLEEPY = auto()
-    RESTING = auto()
+from src.monitoring import Diagnostics
+from src.recorder import TrafficRecorder, DEFAULT_TRAFFIC_PATH
+from src.account import AccountStateMachine, AccountState
+from src.checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_PATH
+from src.executor import ActionExecutor
+from src.nn.batcher import InferenceBatcher
 
 
 class KomaruBot:
-    def __init__(self):
-        self.config = get_config()
-        self.app = TelegramClient("my_account", self.config["api_id"], self.config["api_hash"])
+    def __init__(self, config: dict | None = None, app: TelegramClient | None = None, session: str = "my_account"):
+        self.config = config or get_config()
+        self.app = app or TelegramClient(session, self.config["api_id"], self.config["api_hash"])
 
         self.interactor = Interactor(self.app, self.config)
         self.shop = ShopManager(self.interactor)
+        self.scheduler = self.interactor.scheduler
 
         self.target_bot_id = self.config["target_bot_id"]
         self.game_settings = self.config["game_settings"]
         self.behavior_settings = self.config["behavior"]
         self.mode = self.config.get("mode", "automatic")
+        self.catalog_settings = self.config.get("catalog", {})
+        self.catalog = CardCatalog(self.catalog_settings.get("path", DEFAULT_CATALOG_PATH),
+                                   save_interval=self.catalog_settings.get("save_interval_seconds", 30))
 
         self.current_coins = 0
         self.luck_booster_active = False
-        self.is_busy = False
+        self.inventory = None
+        self.executor = ActionExecutor()
 
-        self.state = BotState.ACTIVE
         self.actions_since_rest = 0
-        
-        self.remaining_cooldown = 0
-        self.is_in_cooldown = False
-        self.cooldown_manager_task = None
+
+        self.account = AccountStateMachine(period=self.game_settings.get("cooldown_seconds"),
+                                           booster_reduction=self.game_settings.get("time_booster_reduction_seconds",
+                                                                                    3600),
+                                           claim_timeout=self.game_settings.get("claim_timeout_seconds", 60),
+                                           action_counter=lambda: self.interactor.actions)
+        self.account.on_ready = self._on_account_ready
+        self.account.on_change = self._on_account_change
+        self.account_check_handle = None
+        self.replaying = False
+        self.last_reduction_key = None
+        inference_settings = self.config.get("inference", {})
+        self.inference = InferenceBatcher(lambda texts: get_predictor().predict(texts),
+                                          max_batch_size=inference_settings.get("max_batch_size", 16),
+                                          max_wait_ms=inference_settings.get("max_wait_ms", 5))
+        self.diagnostics = Diagnostics(self.config)
+        self.recorder = None
+
+        self.catchup_settings = self.config.get("catchup", {})
+        self.checkpoint = CheckpointStore(self.catchup_settings.get("path", DEFAULT_CHECKPOINT_PATH),
+                                          save_interval=self.catchup_settings.get("save_interval_seconds", 30))
+        self.history_lock = asyncio.Lock()
+        self.connection_watchdog_task = None
 
 
     async def start(self):
         await self.app.start()
-        self.cooldown_manager_task = asyncio.create_task(self._cooldown_manager())
+        self.diagnostics.start()
+        self.executor.start()
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload_model)
+            except (NotImplementedError, RuntimeError):
+                pass
 
         try:
             bot_entity = await self.app.get_entity(self.target_bot_id)
@@ -55,57 +86,163 @@ class KomaruBot:
             logger.error(strings.LOG_FAILED_RESOLVE_TARGET_BOT_ID.format(e=e))
             return
 
-        await self.update_balance_from_profile()
-        logger.info(strings.LOG_ANALYZING_STATE)
+        account_state = self.checkpoint.get_state(self.target_bot_id)
+        if account_state:
+            self.account.restore(account_state)
+            logger.info(strings.LOG_ACCOUNT_RESTORED.format(state=self.account.state.name.lower(),
+                                                            seconds=self.account.seconds_until_ready()))
 
-        if self.mode == "semi-automatic":
-            await self._check_and_use_boosters()
-            await human_delay(2, 5)
-            await self.app.send_message(self.target_bot_id, strings.CMD_KOMARU)
-            await self._main_loop(initial_state=None)
-        else:
-            async for last_msg in self.app.iter_messages(self.target_bot_id, limit=1):
-                message_text = get_message_text(last_msg)
-                if not message_text:
-                    logger.info(strings.LOG_INITIAL_STATE_CLEAR)
-                    await self._main_loop(initial_state=None)
-                    break
-
-                parsed_initial = parse_message(message_text)
-                if parsed_initial.type == MessageType.COOLDOWN:
-                    logger.info(strings.LOG_INITIAL_STATE_COOLDOWN)
-                    await self._main_loop(initial_state=parsed_initial)
-                else:
-                    logger.info(strings.LOG_INITIAL_STATE_CLEAR)
-                    await self._main_loop(initial_state=None)
-                break
+        recorder_settings = self.config.get("recorder", {})
+        if recorder_settings.get("enabled", False):
+            self.recorder = TrafficRecorder(recorder_settings.get("path", DEFAULT_TRAFFIC_PATH))
+            self.recorder.attach(self.app, self.target_bot_id)
+            self.scheduler.recorder = self.recorder
+
+        if not len(self.catalog):
+            await self.backfill_catalog()
+
+        await self._refresh_profile()
+        logger.info(strings.LOG_ANALYZING_STATE)
+        await self._main_loop()
 
         await self.app.run_until_disconnected()
 
-    async def _cooldown_manager(self):
+    async def stop(self):
+        if self.account_check_handle:
+            self.account_check_handle.cancel()
+        logger.debug(self.account.describe_stats())
+        if self.connection_watchdog_task:
+            self.connection_watchdog_task.cancel()
+        self.checkpoint.save()
+        self.catalog.save()
+        self.executor.stop()
+        self.inference.close()
+        if self.diagnostics.lag_monitor:
+            self.diagnostics.lag_monitor.stop()
+        if self.recorder:
+            self.recorder.close()
+        await self.app.disconnect()
+
+    def reload_model(self):
+        logger.info(strings.LOG_MODEL_RELOAD_REQUESTED)
+        if not reload_predictor(get_config().get("model", {})):
+            logger.info(strings.LOG_MODEL_NOT_LOADED)
+
+    def _on_account_change(self):
+        self.checkpoint.set_state(self.target_bot_id, self.account.snapshot())
+        self._schedule_account_check()
+
+    def _schedule_account_check(self):
+        if self.account_check_handle:
+            self.account_check_handle.cancel()
+            self.account_check_handle = None
+        delay = self.account.next_check_in()
+        if delay is not None:
+            self.account_check_handle = asyncio.get_running_loop().call_later(delay, self.account.tick)
+
+    def _on_account_ready(self, previous: AccountState):
+        if self.replaying:
+            return
+        if previous is not AccountState.CLAIMING:
+            logger.info(strings.LOG_COOLDOWN_CLEARED_SENDING_CMD)
+        self._decide_and_act()
+
+    async def catch_up(self) -> int:
+        if not self.catchup_settings.get("enabled", True):
+            return 0
+        last_id = self.checkpoint.get(self.target_bot_id)
+        first_run = last_id is None
+        if first_run:
+            limit = self.catchup_settings.get("initial_messages", 20)
+            logger.info(strings.LOG_CATCHUP_INITIAL.format(limit=limit))
+        else:
+            limit = self.catchup_settings.get("max_messages", 500)
+            logger.info(strings.LOG_CATCHUP_FETCHING.format(last_id=last_id))
+        started = time.monotonic()
+
+        messages = [msg async for msg in self.app.iter_messages(self.target_bot_id, min_id=last_id or 0, limit=limit)]
+        if not first_run and len(messages) >= limit:
+            logger.warning(strings.LOG_CATCHUP_TRUNCATED.format(limit=limit))
+        messages.reverse()
+        missed = [(msg, get_message_text(msg)) for msg in messages if not msg.out]
+        missed = [(msg, text) for msg, text in missed if text]
+
+        batch_size = self.inference.max_batch_size
+        parsed_messages = []
+        for i in range(0, len(missed), batch_size):
+            parsed_messages.extend(await asyncio.gather(*(parse_message_async(text, self.catalog, self.inference)
+                                                          for _, text in missed[i:i + batch_size])))
+
+        counts = {MessageType.COOLDOWN: 0, MessageType.NEW_CARD: 0}
+        self.replaying = True
+        try:
+            for (msg, _), parsed in zip(missed, parsed_messages):
+                if await self._handle_parsed(parsed, msg.date.timestamp(), replay=True, record_catalog=not first_run,
+                                             message=msg):
+                    counts[MessageType.COOLDOWN if parsed.type == MessageType.COOLDOWN else MessageType.NEW_CARD] += 1
+        finally:
+            self.replaying = False
+        if messages:
+            self.checkpoint.advance(self.target_bot_id, messages[-1].id)
+
+        logger.info(strings.LOG_CATCHUP_DONE.format(count=len(missed), cards=counts[MessageType.NEW_CARD],
+                                                    cooldowns=counts[MessageType.COOLDOWN],
+                                                    elapsed=time.monotonic() - started))
+        return sum(counts.values())
+
+    def _resume(self, delay: tuple[float, float] = (10, 45)):
+        if self.account.state is AccountState.COOLDOWN:
+            self._react_to_cooldown()
+        elif self.account.state is AccountState.READY and not (self.executor.is_pending("boosters")
+                                                              or self.executor.is_pending("card_claim")):
+            self._decide_and_act(delay)
+
+    async def _connection_watchdog(self):
+        interval = self.catchup_settings.get("reconnect_check_seconds", 5)
+        connected = True
         while True:
-            await asyncio.sleep(1)
-            if self.is_in_cooldown and self.remaining_cooldown > 0:
-                self.remaining_cooldown -= 1
-                if self.remaining_cooldown <= 0:
-                    if self.is_in_cooldown:
-                        self.is_in_cooldown = False
-                        logger.info(strings.LOG_COOLDOWN_CLEARED_SENDING_CMD)
-                        if not self.is_busy:
-                            asyncio.create_task(self._decide_and_act())
+            await asyncio.sleep(interval)
+            now_connected = self.app.is_connected()
+            if now_connected and not connected:
+                logger.info(strings.LOG_CATCHUP_RECONNECTED)
+                try:
+                    async with self.history_lock:
+                        replayed = await self.catch_up()
+                    if replayed:
+                        self._resume()
+                except Exception as e:
+                    logger.error(strings.LOG_CATCHUP_ERROR.format(e=e))
+            connected = now_connected
+
+    async def backfill_catalog(self):
+        limit = self.catalog_settings.get("backfill_limit", 3000)
+        logger.info(strings.LOG_CATALOG_BACKFILLING.format(limit=limit))
+        cards = []
+        scanned = 0
+        async for msg in self.app.iter_messages(self.target_bot_id, limit=limit):
+            scanned += 1
+            message_text = get_message_text(msg)
+            if not message_text:
+                continue
+            card = parse_card(message_text)
+            if card:
+                cards.append((card.name, card.rarity_label, msg.date.timestamp()))
+
+        cards.reverse()
+        added = self.catalog.backfill(cards)
+        logger.info(strings.LOG_CATALOG_BACKFILLED.format(added=added, scanned=scanned))
 
     async def update_balance_from_profile(self):
         logger.info(strings.LOG_UPDATING_BALANCE)
-        self.is_busy = True
         try:
             msg = await self.interactor.execute_action(ActionMode.SEND, message=strings.CMD_PROFILE)
             message_text = get_message_text(msg)
             if not message_text:
                 logger.warning(strings.LOG_PROFILE_NO_TEXT)
             else:
-                parsed = parse_message(message_text)
+                parsed = await parse_message_async(message_text, self.catalog, self.inference)
                 if parsed.type == MessageType.PROFILE_INFO:
-                    self.current_coins = parsed.details["total_coins"]
+                    self.current_coins = parsed.record.total_coins
                     logger.success(strings.LOG_BALANCE_UPDATED.format(coins=self.current_coins))
                     await human_delay(1, 3)
                 else:
@@ -114,141 +251,217 @@ class KomaruBot:
             logger.error(strings.LOG_PROFILE_TIMEOUT)
         except Exception as e:
             logger.error(strings.LOG_PROFILE_UPDATE_ERROR.format(e=e))
-        finally:
-            self.is_busy = False
-
 
-    async def _handle_card_reception(self, parsed_data):
-        self.is_in_cooldown = False
-        self.remaining_cooldown = 0
+    def _refresh_profile(self) -> asyncio.Future:
+        return self.executor.submit("profile", self.update_balance_from_profile, ActionPriority.PROFILE_REFRESH)
 
-        self.current_coins = parsed_data.details["total_coins"]
-        logger.success(strings.LOG_GOT_CARD.format(name=parsed_data.details['name'], coins=self.current_coins))
+    async def _send_card_command(self):
+        if not self.account.claim():
+            logger.info(strings.LOG_ACCOUNT_CLAIM_SKIPPED.format(state=self.account.state.name.lower(),
+                                                                 seconds=self.account.seconds_until_ready()))
+            return
+        await self.scheduler.send_message(self.target_bot_id, strings.CMD_KOMARU)
+
+    async def _handle_parsed(self, parsed, seen_at: float | None = None, replay: bool = False,
+                             record_catalog: bool = True, message=None) -> bool:
+        if parsed.type in [MessageType.NEW_CARD, MessageType.DUPLICATE_CARD]:
+            await self._handle_card_reception(parsed, seen_at, replay, record_catalog)
+        elif parsed.type == MessageType.COOLDOWN:
+            await self._handle_cooldown(parsed, seen_at, replay)
+        elif parsed.type == MessageType.PROFILE_INFO and replay:
+            self.current_coins = parsed.record.total_coins
+            return False
+        elif parsed.type == MessageType.COOLDOWN_REDUCED:
+            self._handle_cooldown_reduced(message)
+            return False
+        else:
+            return False
+        return True
+
+    async def _handle_card_reception(self, parsed_data, seen_at: float | None = None, replay: bool = False,
+                                     record_catalog: bool = True):
+        card = parsed_data.record
+        self.current_coins = card.total_coins
+        logger.success(strings.LOG_GOT_CARD.format(name=card.name, coins=self.current_coins))
+
+        if record_catalog and self.catalog.record(card.name, card.rarity_label, seen_at):
+            logger.info(strings.LOG_CATALOG_NEW_CARD.format(name=card.name, total=len(self.catalog)))
+        logger.debug(strings.LOG_CATALOG_STATS.format(cards=parse_stats.card_messages,
+                                                      model_calls=parse_stats.model_calls,
+                                                      reduction=parse_stats.model_call_reduction,
+                                                      lookup_ns=self.catalog.avg_lookup_ns))
 
         self.luck_booster_active = False
-        await self._decide_and_act()
+        self.account.on_card(seen_at, observe_clock=not replay)
+        if not replay and self.account.state is AccountState.COOLDOWN:
+            self._react_to_cooldown()
 
 
-    async def _handle_cooldown(self, parsed_data):
-        cooldown = parsed_data.details['cooldown']
-        self.remaining_cooldown = cooldown
-        self.is_in_cooldown = True
-        
+    async def _handle_cooldown(self, parsed_data, seen_at: float | None = None, replay: bool = False):
+        self.account.on_refusal(parsed_data.record.seconds, seen_at, observe_clock=not replay)
+        logger.debug(self.account.describe())
+        if not replay:
+            self.executor.cancel("card_claim", running=False)
+            self._react_to_cooldown()
+
+    def _react_to_cooldown(self):
+        cooldown = self.account.seconds_until_ready()
         h, m, s = cooldown // 3600, (cooldown % 3600) // 60, cooldown % 60
         logger.warning(strings.LOG_COOLDOWN.format(h=h, m=m, s=s))
 
         if self.mode == "automatic":
             use_chance = self.behavior_settings["use_time_booster_chance"]
-            if cooldown > 3600 and random.random() < use_chance:
-                self.is_busy = True
-                logger.info(strings.LOG_COOLDOWN_USE_BOOSTER)
-                booster_name = strings.BOOSTER_TIME
-                booster_count, booster_msg = await self.shop.get_booster_count(booster_name)
-                if booster_count > 0:
-                    await self.shop.use_booster(booster_name)
-                elif self.current_coins >= self.game_settings["time_booster_cost"]:
-                    if await self.shop.buy_booster(booster_name):
-                        await self.update_balance_from_profile()
-                        _, new_booster_msg = await self.shop.get_booster_count(booster_name)
-                        if new_booster_msg:
-                            await self.shop.use_booster(booster_name)
-                else:
-                    if booster_msg:
-                        await self.shop.navigate_back(booster_msg)
-
-                self.is_busy = False
-                logger.info(strings.LOG_CHECKING_NEW_COOLDOWN)
-                await human_delay(3, 7)
-                await self.app.send_message(self.target_bot_id, strings.CMD_KOMARU)
+            worth_boosting = cooldown > self.account.booster_reduction
+            if worth_boosting and random.random() < use_chance:
+                self.executor.submit("time_booster", self._use_time_booster, ActionPriority.BOOSTER_USE)
             else:
-                if cooldown > 3600: logger.info(strings.LOG_COOLDOWN_WAIT)
+                if worth_boosting: logger.info(strings.LOG_COOLDOWN_WAIT)
                 logger.info(strings.LOG_WAITING_SECS.format(seconds=cooldown))
         else:
             logger.info(strings.LOG_WAITING_SECS.format(seconds=cooldown))
 
+    async def _use_time_booster(self):
+        logger.info(strings.LOG_COOLDOWN_USE_BOOSTER)
+        booster_name = strings.BOOSTER_TIME
+        with self.account.shopping():
+            if await self._get_booster(booster_name) > 0:
+                await self._use_booster(booster_name)
+            elif self.current_coins >= self.game_settings["time_booster_cost"]:
+                await self._buy_and_use_booster(booster_name, self.game_settings["time_booster_cost"])
+
+    def _handle_cooldown_reduced(self, message=None):
+        key = (message.id, message.edit_date) if message is not None else None
+        if key is not None and key == self.last_reduction_key:
+            return
+        self.last_reduction_key = key
+        self.account.on_time_booster()
+
+        remaining = self.account.seconds_until_ready()
+        h, m, s = remaining // 3600, (remaining % 3600) // 60, remaining % 60
+        logger.info(strings.LOG_COOLDOWN_NEW_DURATION.format(h=h, m=m, s=s))
+        if not self.replaying and remaining > self.account.booster_reduction:
+            self._react_to_cooldown()
+        elif remaining:
+            logger.info(strings.LOG_WAITING_SECS.format(seconds=remaining))
+
+    async def _get_booster(self, booster_name: str) -> int:
+        max_age = self.game_settings.get("inventory_max_age_seconds", 1800)
+        if self.inventory is None or time.monotonic() - self.inventory.taken_at > max_age:
+            snapshot = await self.shop.get_inventory_snapshot()
+            self.inventory = snapshot if snapshot and snapshot.boosters else None
+            if self.inventory and snapshot.is_active(strings.BOOSTER_LUCK):
+                self.luck_booster_active = True
+
+        info = self.inventory.get(booster_name) if self.inventory else None
+        if info is not None and info.count is not None:
+            return info.count
+        count = await self.shop.get_booster_count(booster_name)
+        count = count[0] if isinstance(count, tuple) else count
+        if self.inventory:
+            self.inventory.merge({booster_name: BoosterInfo(booster_name, count=count)})
+        return count
+
+    async def _use_booster(self, booster_name: str) -> bool | str:
+        result = await self.shop.use_booster(booster_name)
+        if result is True and self.inventory:
+            self.inventory.adjust(booster_name, -1)
+        elif result is not False:
+            self.inventory = None
+        return result
+
+    async def _buy_and_use_booster(self, booster_name: str, cost: int) -> bool | str:
+        buy_result, use_result = await self.shop.run_transaction([
+            ShopOperation(ShopAction.BUY, booster_name),
+            ShopOperation(ShopAction.USE, booster_name)
+        ], inventory=self.inventory)
+        if buy_result.balance is not None:
+            self.current_coins = buy_result.balance
+            logger.success(strings.LOG_BALANCE_UPDATED.format(coins=self.current_coins))
+        elif buy_result.completed:
+            self.current_coins -= cost * buy_result.completed
+        if use_result.status is True or not buy_result.completed:
+            if self.inventory:
+                self.inventory.adjust(booster_name, buy_result.completed - use_result.completed)
+        else:
+            self.inventory = None
+        return use_result.status
+
     async def _check_and_use_boosters(self):
-        if random.random() < self.behavior_settings["spontaneous_profile_check_chance"]:
+        refresh_queued = self.executor.cancel("profile", running=False)
+        if refresh_queued or random.random() < self.behavior_settings["spontaneous_profile_check_chance"]:
             await self.update_balance_from_profile()
 
         min_coins_for_luck = self.game_settings["luck_booster_min_coins_threshold"]
         if not self.luck_booster_active and self.current_coins > min_coins_for_luck:
             booster_name = strings.BOOSTER_LUCK
-            booster_result = await self.shop.get_booster_count(booster_name)
-
-            if isinstance(booster_result, tuple):
-                booster_count, booster_msg = booster_result
-            else:
-                booster_count = booster_result
-                booster_msg = None
-
-            if booster_count > 0:
-                result = await self.shop.use_booster(booster_name, from_message=booster_msg)
-                if result == "already_active":
-                    self.luck_booster_active = True
-                elif result:
-                    self.luck_booster_active = True
-
-            elif self.current_coins >= self.game_settings["luck_booster_cost"] + min_coins_for_luck:
-                if await self.shop.buy_booster(booster_name):
-                    await self.update_balance_from_profile()
-
-                    new_booster_result = await self.shop.get_booster_count(booster_name)
-                    if isinstance(new_booster_result, tuple):
-                        new_count, new_booster_msg = new_booster_result
-                    else:
-                        new_booster_msg = None
-
-                    if new_booster_msg:
-                        result = await self.shop.use_booster(booster_name, from_message=new_booster_msg)
-                        if result == "already_active" or result:
-                            self.luck_booster_active = True
-            else:
-                if booster_msg:
-                    await self.shop.navigate_back(booster_msg)
+            with self.account.shopping():
+                booster_count = await self._get_booster(booster_name)
 
-    async def _decide_and_act(self):
-        self.is_busy = True
-        self.actions_since_rest += 1
-
-        if self.actions_since_rest > self.behavior_settings["max_actions_before_rest"]:
-            self.state = BotState.SLEEPY
+                if self.luck_booster_active:
+                    return
+                if booster_count > 0:
+                    result = await self._use_booster(booster_name)
+                    if result == "already_active":
+                        self.luck_booster_active = True
+                    elif result:
+                        self.luck_booster_active = True
+
+                elif self.current_coins >= self.game_settings["luck_booster_cost"] + min_coins_for_luck:
+                    if await self._buy_and_use_booster(booster_name, self.game_settings["luck_booster_cost"]):
+                        self.luck_booster_active = True
+
+    def _decide_and_act(self, delay: tuple[float, float] = (10, 45)):
+        queued = self.executor.is_queued("boosters")
+        if not queued:
+            self.actions_since_rest += 1
+
+        if self.executor.resting:
+            logger.debug(strings.LOG_BOT_RESTING_QUEUED)
+        elif not queued and self.actions_since_rest > self.behavior_settings["max_actions_before_rest"]:
             if random.random() < self.behavior_settings["rest_chance"]:
-                self.state = BotState.RESTING
                 rest_min = self.behavior_settings["rest_duration_min_minutes"]
                 rest_max = self.behavior_settings["rest_duration_max_minutes"]
                 rest_duration = random.uniform(rest_min * 60, rest_max * 60)
                 logger.info(strings.LOG_BOT_TIRED.format(minutes=rest_duration / 60))
+                self.account.rest()
+                self.executor.rest(rest_duration, on_wake=self._wake_up)
 
-                await asyncio.sleep(rest_duration)
+        self.executor.submit("boosters", lambda: self._prepare_card_claim(delay), ActionPriority.BOOSTER_USE)
 
-                logger.info(strings.LOG_BOT_WAKING_UP)
-                await self.update_balance_from_profile()
-                self.actions_since_rest = 0
-                self.state = BotState.ACTIVE
+    def _wake_up(self):
+        logger.info(strings.LOG_BOT_WAKING_UP)
+        self.actions_since_rest = 0
+        self.account.wake()
+        self._refresh_profile()
 
+    async def _prepare_card_claim(self, delay: tuple[float, float]):
         await self._check_and_use_boosters()
+        self.executor.submit("card_claim", lambda: self._claim_card(delay), ActionPriority.CARD_CLAIM)
 
-        self.is_busy = False
-        await human_delay(10, 45)
+    async def _claim_card(self, delay: tuple[float, float]):
+        await human_delay(*delay)
         logger.info(strings.LOG_SENDING_CARD_MESSAGE)
-        await self.app.send_message(self.target_bot_id, strings.CMD_KOMARU)
+        await self._send_card_command()
+        logger.debug(self.scheduler.describe_stats())
+        logger.debug(self.executor.describe_stats())
 
 
-    async def _main_loop(self, initial_state=None):
+    async def _main_loop(self):
         @self.app.on(events.NewMessage(chats=self.target_bot_id))
         async def message_handler(event):
             message = event.message
-            message_text = get_message_text(message)
-            if not message_text:
-                logger.debug(strings.LOG_EMPTY_MESSAGE_IGNORED)
-                return
+            async with self.history_lock:
+                if self.checkpoint.is_processed(self.target_bot_id, message.id):
+                    return
+                self.checkpoint.advance(self.target_bot_id, message.id)
+                message_text = get_message_text(message)
+                if not message_text:
+                    logger.debug(strings.LOG_EMPTY_MESSAGE_IGNORED)
+                    return
 
-            parsed = parse_message(message_text)
-            logger.debug(parsed.__str__())
-            if parsed.type in [MessageType.NEW_CARD, MessageType.DUPLICATE_CARD]:
-                await self._handle_card_reception(parsed)
-            elif parsed.type == MessageType.COOLDOWN:
-                await self._handle_cooldown(parsed)
+                parsed = await parse_message_async(message_text, self.catalog, self.inference)
+                logger.debug(parsed.__str__())
+                await self._handle_parsed(parsed, message.date.timestamp(), message=message)
 
         @self.app.on(events.MessageEdited(chats=self.target_bot_id))
         async def message_edited_handler(event):
@@ -257,27 +470,15 @@ class KomaruBot:
             if not message_text:
                 return
 
-            parsed = parse_message(message_text)
-            if parsed.type == MessageType.COOLDOWN_REDUCED and self.mode == "semi-automatic":
-                logger.debug(strings.LOG_COOLDOWN_TASK_CANCELLED_REDUCTION)
-                
-                self.remaining_cooldown = max(0, self.remaining_cooldown - 3600)
-                
-                h, m, s = self.remaining_cooldown // 3600, (
-                        self.remaining_cooldown % 3600) // 60, self.remaining_cooldown % 60
-                logger.info(strings.LOG_COOLDOWN_NEW_DURATION.format(h=h, m=m, s=s))
-
-                if self.remaining_cooldown <= 0 and self.is_in_cooldown:
-                    self.is_in_cooldown = False
-                    logger.info(strings.LOG_COOLDOWN_CLEARED_SENDING_CMD)
-                    asyncio.create_task(self._decide_and_act())
-                else:
-                    logger.info(strings.LOG_WAITING_SECS.format(seconds=self.remaining_cooldown))
+            parsed = await parse_message_async(message_text, self.catalog, self.inference)
+            if parsed.type == MessageType.COOLDOWN_REDUCED:
+                self._handle_cooldown_reduced(message)
 
         logger.info(strings.LOG_MAIN_LOOP_RUNNING)
-        if initial_state:
-            await self._handle_cooldown(initial_state)
-        else:
-            if self.mode == "automatic":
-                await self._decide_and_act()
+        async with self.history_lock:
+            await self.catch_up()
+        if self.catchup_settings.get("enabled", True):
+            self.connection_watchdog_task = asyncio.create_task(self._connection_watchdog())
+
+        self._resume((2, 5) if self.mode == "semi-automatic" else (10, 45))
         await asyncio.Event().wait()
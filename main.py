@@ -3,7 +3,10 @@ from bot import KomaruBot
 
 async def main():
     bot = KomaruBot()
-    await bot.start()
+    try:
+        await bot.start()
+    finally:
+        await bot.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
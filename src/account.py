@@ -0,0 +1,219 @@
+import math
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from enum import Enum, auto
+from typing import Callable
+
+from .logger import logger
+from .models import strings
+
+
+class AccountState(Enum):
+    READY = auto()
+    CLAIMING = auto()
+    COOLDOWN = auto()
+    RESTING = auto()
+    SHOPPING = auto()
+
+
+BUSY_STATES = (AccountState.RESTING, AccountState.SHOPPING)
+PERSISTED_FIELDS = ("deadline", "period", "booster_reduction", "last_card_at", "reduction_since_card",
+                    "assumed_since_card", "assumed_since_refusal", "anchored")
+
+
+class AccountStateMachine:
+    def __init__(self, period: float | None = None, booster_reduction: float = 3600, claim_timeout: float = 60,
+                 action_counter: Callable[[], int] | None = None):
+        self.period = period
+        self.booster_reduction = booster_reduction
+        self.claim_timeout = claim_timeout
+        self.action_counter = action_counter or (lambda: 0)
+        self.on_ready: Callable[[AccountState], None] | None = None
+        self.on_change: Callable[[], None] | None = None
+
+        self.state = AccountState.READY
+        self.deadline: float | None = None
+        self.last_card_at: float | None = None
+        self.clock_offset = 0.0
+        self.last_error: float | None = None
+        self.reduction_since_card = 0.0
+        self.assumed_since_card = 0
+        self.assumed_since_refusal = 0
+        self.anchored = False
+        self.claim_due = False
+
+        self.cards = 0
+        self.probes = Counter()
+        self.wasted_probes = Counter()
+        self.transitions = Counter()
+        self.dwell = Counter()
+        self.actions = Counter()
+        self._entered_at = time.monotonic()
+        self._actions_at_entry = self.action_counter()
+
+    def server_now(self) -> float:
+        return time.time() + self.clock_offset
+
+    def _observe_clock(self, server_ts: float | None):
+        if server_ts is not None:
+            self.clock_offset = server_ts - time.time()
+
+    def _enter(self, state: AccountState):
+        if state is self.state:
+            return
+        previous = self.state
+        now, actions = time.monotonic(), self.action_counter()
+        self.dwell[self.state] += now - self._entered_at
+        self.actions[self.state] += actions - self._actions_at_entry
+        self.transitions[self.state, state] += 1
+        logger.debug(strings.LOG_ACCOUNT_TRANSITION.format(old=self.state.name.lower(), new=state.name.lower()))
+        self.state, self._entered_at, self._actions_at_entry = state, now, actions
+
+        if state in (AccountState.CLAIMING, AccountState.COOLDOWN):
+            self.claim_due = True
+        elif state is AccountState.READY and self.claim_due:
+            self.claim_due = False
+            if self.on_ready:
+                self.on_ready(previous)
+
+    def _settle(self, force: bool = False):
+        if force or self.state not in BUSY_STATES:
+            self._enter(AccountState.READY if self.deadline_passed() else AccountState.COOLDOWN)
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def deadline_passed(self) -> bool:
+        return self.deadline is None or self.server_now() >= self.deadline
+
+    def seconds_until_ready(self) -> int:
+        if self.deadline is None:
+            return 0
+        return max(0, math.ceil(self.deadline - self.server_now()))
+
+    def next_check_in(self) -> float | None:
+        if self.state is AccountState.CLAIMING:
+            return max(0.0, self._entered_at + self.claim_timeout - time.monotonic())
+        if self.state is AccountState.COOLDOWN:
+            return self.seconds_until_ready()
+        return None
+
+    def tick(self):
+        if self.state is AccountState.CLAIMING and time.monotonic() - self._entered_at >= self.claim_timeout:
+            self._settle()
+        elif self.state is AccountState.COOLDOWN and self.deadline_passed():
+            self._enter(AccountState.READY)
+        self._changed()
+
+    def claim(self) -> bool:
+        self.tick()
+        if self.state is not AccountState.READY:
+            return False
+        self.probes[date.today().isoformat()] += 1
+        self._enter(AccountState.CLAIMING)
+        self._changed()
+        return True
+
+    @property
+    def wasted_today(self) -> int:
+        return self.wasted_probes[date.today().isoformat()]
+
+    def on_card(self, server_ts: float | None = None, observe_clock: bool = True):
+        if observe_clock:
+            self._observe_clock(server_ts)
+        self.cards += 1
+        self.last_card_at = server_ts if server_ts is not None else self.server_now()
+        self.reduction_since_card = 0.0
+        self.assumed_since_card = self.assumed_since_refusal = 0
+        self.anchored = False
+        self.deadline = self.last_card_at + self.period if self.period else None
+        self._settle(force=self.state is AccountState.CLAIMING)
+        self._changed()
+
+    def on_refusal(self, remaining: float, server_ts: float | None = None, observe_clock: bool = True):
+        if observe_clock:
+            self._observe_clock(server_ts)
+        observed_at = server_ts if server_ts is not None else self.server_now()
+        observed_deadline = observed_at + remaining
+
+        if self.state is AccountState.CLAIMING:
+            self.wasted_probes[date.today().isoformat()] += 1
+            if self.deadline is not None:
+                self.last_error = observed_deadline - self.deadline
+                logger.debug(strings.LOG_COOLDOWN_PREDICTION_ERROR.format(error=self.last_error))
+
+        if self.anchored and self.assumed_since_refusal and self.deadline is not None:
+            reduction = self.booster_reduction - (observed_deadline - self.deadline) / self.assumed_since_refusal
+            if reduction > 0 and abs(reduction - self.booster_reduction) > 1:
+                self.reduction_since_card += (reduction - self.booster_reduction) * self.assumed_since_card
+                self.booster_reduction = reduction
+                logger.info(strings.LOG_COOLDOWN_REDUCTION_LEARNED.format(seconds=int(reduction)))
+
+        if self.last_card_at is not None:
+            period = observed_deadline + self.reduction_since_card - self.last_card_at
+            if period > 0 and (self.period is None or abs(period - self.period) > 1):
+                self.period = period
+                logger.info(strings.LOG_COOLDOWN_PERIOD_LEARNED.format(seconds=int(period)))
+
+        self.deadline = observed_deadline
+        self.anchored = True
+        self.assumed_since_refusal = 0
+        self._settle(force=self.state is AccountState.CLAIMING)
+        self._changed()
+
+    def on_time_booster(self):
+        self.assumed_since_card += 1
+        self.assumed_since_refusal += 1
+        self.reduction_since_card += self.booster_reduction
+        if self.deadline is not None:
+            self.deadline -= self.booster_reduction
+        self._settle()
+        self._changed()
+
+    @contextmanager
+    def shopping(self):
+        if self.state in BUSY_STATES or self.state is AccountState.CLAIMING:
+            yield
+            return
+        self._enter(AccountState.SHOPPING)
+        try:
+            yield
+        finally:
+            if self.state is AccountState.SHOPPING:
+                self._settle(force=True)
+            self._changed()
+
+    def rest(self):
+        self._enter(AccountState.RESTING)
+        self._changed()
+
+    def wake(self):
+        if self.state is AccountState.RESTING:
+            self._settle(force=True)
+        self._changed()
+
+    def snapshot(self) -> dict:
+        return {name: getattr(self, name) for name in PERSISTED_FIELDS}
+
+    def restore(self, state: dict):
+        for name in PERSISTED_FIELDS:
+            if name in state:
+                setattr(self, name, state[name])
+        self._settle()
+        self._changed()
+
+    def describe(self) -> str:
+        today = date.today().isoformat()
+        return strings.LOG_COOLDOWN_PROBE_STATS.format(probes=self.probes[today], wasted=self.wasted_probes[today],
+                                                       period=int(self.period) if self.period else None)
+
+    def describe_stats(self) -> str:
+        transitions = ", ".join(f"{old.name.lower()}->{new.name.lower()} {count}"
+                                for (old, new), count in sorted(self.transitions.items(), key=lambda i: -i[1]))
+        states = ", ".join(f"{state.name.lower()} {self.dwell[state]:.0f}s/{self.actions[state]} actions"
+                           for state in AccountState if self.dwell[state] or self.actions[state])
+        return strings.LOG_ACCOUNT_STATS.format(state=self.state.name.lower(), transitions=transitions or "none",
+                                                states=states or "none")
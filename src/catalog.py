@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+
+from .logger import logger
+from .models import strings
+
+DEFAULT_CATALOG_PATH = "./data/card_catalog.json"
+
+
+@dataclass
+class CatalogEntry:
+    rarity: str
+    first_seen: float
+    count: int = 1
+
+
+class CardCatalog:
+    def __init__(self, path: str | None = DEFAULT_CATALOG_PATH, save_interval: float = 30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.entries: dict[str, CatalogEntry] = {}
+        self.lookups = 0
+        self.lookup_ns = 0
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if path:
+            self.load()
+
+    def __contains__(self, name: str) -> bool:
+        started = time.perf_counter_ns()
+        found = name in self.entries
+        self.lookup_ns += time.perf_counter_ns() - started
+        self.lookups += 1
+        return found
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> CatalogEntry | None:
+        return self.entries.get(name)
+
+    @property
+    def avg_lookup_ns(self) -> float:
+        return self.lookup_ns / self.lookups if self.lookups else 0.0
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.entries = {name: CatalogEntry(**entry) for name, entry in raw.items()}
+            logger.debug(strings.LOG_CATALOG_LOADED.format(count=len(self.entries), path=self.path))
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(strings.LOG_CATALOG_LOAD_ERROR.format(path=self.path, e=e))
+            self.entries = {}
+
+    def save(self):
+        self._saved_at = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({name: asdict(entry) for name, entry in self.entries.items()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def record(self, name: str, rarity: str, seen_at: float | None = None, save: bool = True) -> bool:
+        seen_at = time.time() if seen_at is None else seen_at
+        entry = self.entries.get(name)
+        is_new = entry is None
+        if is_new:
+            self.entries[name] = CatalogEntry(rarity=rarity, first_seen=seen_at)
+        else:
+            entry.count += 1
+            entry.first_seen = min(entry.first_seen, seen_at)
+        self._dirty = True
+        if save and time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+        return is_new
+
+    def backfill(self, cards: list[tuple[str, str, float]]) -> int:
+        added = 0
+        for name, rarity, seen_at in cards:
+            if self.record(name, rarity, seen_at, save=False):
+                added += 1
+        self.save()
+        return added
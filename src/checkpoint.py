@@ -0,0 +1,77 @@
+import json
+import os
+import time
+
+from .logger import logger
+from .models import strings
+
+DEFAULT_CHECKPOINT_PATH = "./data/checkpoint.json"
+
+
+class CheckpointStore:
+    def __init__(self, path: str | None = DEFAULT_CHECKPOINT_PATH, save_interval: float = 30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.last_ids: dict[str, int] = {}
+        self.states: dict[str, dict] = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if path:
+            self.load()
+
+    def get(self, chat_id: int) -> int | None:
+        return self.last_ids.get(str(chat_id))
+
+    def is_processed(self, chat_id: int, message_id: int) -> bool:
+        last_id = self.get(chat_id)
+        return last_id is not None and message_id <= last_id
+
+    def advance(self, chat_id: int, message_id: int):
+        if self.is_processed(chat_id, message_id):
+            return
+        self.last_ids[str(chat_id)] = message_id
+        self._mark_dirty()
+
+    def get_state(self, chat_id: int) -> dict | None:
+        return self.states.get(str(chat_id))
+
+    def set_state(self, chat_id: int, state: dict):
+        if self.states.get(str(chat_id)) == state:
+            return
+        self.states[str(chat_id)] = state
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if "messages" not in raw:
+                raw = {"messages": raw}
+            self.last_ids = {chat: int(message_id) for chat, message_id in raw["messages"].items()}
+            self.states = {chat: dict(state) for chat, state in raw.get("states", {}).items()}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.error(strings.LOG_CHECKPOINT_LOAD_ERROR.format(path=self.path, e=e))
+            self.last_ids, self.states = {}, {}
+
+    def save(self):
+        self._saved_at = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"messages": self.last_ids, "states": self.states}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(strings.LOG_CHECKPOINT_SAVE_ERROR.format(path=self.path, e=e))
@@ -16,7 +16,10 @@ def create_default_config(config_path=CONFIG_FILE_PATH):
             "game_settings": {
                 "time_booster_cost": 15,
                 "luck_booster_cost": 20,
-                "luck_booster_min_coins_threshold": 45
+                "luck_booster_min_coins_threshold": 45,
+                "time_booster_reduction_seconds": 3600,
+                "claim_timeout_seconds": 60,
+                "inventory_max_age_seconds": 1800
             },
             "behavior": {
                 "use_time_booster_chance": 0.8,
@@ -25,6 +28,46 @@ def create_default_config(config_path=CONFIG_FILE_PATH):
                 "rest_chance": 0.5,
                 "rest_duration_min_minutes": 45,
                 "rest_duration_max_minutes": 75
+            },
+            "model": {
+                "path": "./data/card_classifier.pth",
+                "profile_path": "./data/inference_profile.json",
+                "candidate_path": "",
+                "shadow": True
+            },
+            "inference": {
+                "max_batch_size": 16,
+                "max_wait_ms": 5
+            },
+            "catalog": {
+                "path": "./data/card_catalog.json",
+                "backfill_limit": 3000,
+                "save_interval_seconds": 30
+            },
+            "catchup": {
+                "enabled": True,
+                "path": "./data/checkpoint.json",
+                "max_messages": 500,
+                "initial_messages": 20,
+                "save_interval_seconds": 30,
+                "reconnect_check_seconds": 5
+            },
+            "outbound": {
+                "rate_per_minute": 20,
+                "burst": 3,
+                "max_flood_wait_seconds": 3600
+            },
+            "recorder": {
+                "enabled": False,
+                "path": "./data/traffic/traffic-{date}.jsonl.gz"
+            },
+            "diagnostics": {
+                "loop_lag_monitor": True,
+                "lag_threshold_ms": 500,
+                "lag_report_interval_seconds": 600,
+                "profile_signal": True,
+                "profile_seconds": 30,
+                "profile_trigger_file": "./data/profile.trigger"
             }
         }
         with open(config_path, "w") as f:
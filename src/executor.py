@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from .logger import logger
+from .models import strings, ActionPriority
+
+
+@dataclass(order=True)
+class QueuedAction:
+    priority: int
+    seq: int
+    key: str = field(compare=False)
+    factory: Callable[[], Awaitable] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    cancelled: bool = field(compare=False, default=False)
+
+
+@dataclass
+class ExecutorStats:
+    submitted: int = 0
+    executed: int = 0
+    deduplicated: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    waits: dict = field(default_factory=dict)
+
+    def record_wait(self, priority: ActionPriority, seconds: float):
+        count, total, peak = self.waits.get(priority, (0, 0.0, 0.0))
+        self.waits[priority] = (count + 1, total + seconds, max(peak, seconds))
+
+    def average_wait(self, priority: ActionPriority) -> float:
+        count, total, _ = self.waits.get(priority, (0, 0.0, 0.0))
+        return total / count if count else 0.0
+
+
+class ActionExecutor:
+    def __init__(self):
+        self.stats = ExecutorStats()
+        self.current: QueuedAction | None = None
+        self.resting_until: float | None = None
+
+        self._queue = asyncio.PriorityQueue()
+        self._pending: dict[str, QueuedAction] = {}
+        self._seq = itertools.count()
+        self._awake = asyncio.Event()
+        self._awake.set()
+        self._current_task: asyncio.Task | None = None
+        self._rest_handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None or bool(self._pending)
+
+    @property
+    def resting(self) -> bool:
+        return not self._awake.is_set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        if self._rest_handle:
+            self._rest_handle.cancel()
+        self.cancel_all()
+
+    def is_queued(self, key: str) -> bool:
+        return key in self._pending
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._pending or (self.current is not None and self.current.key == key)
+
+    def submit(self, key: str, factory: Callable[[], Awaitable], priority: ActionPriority) -> asyncio.Future:
+        existing = self._pending.get(key)
+        if existing is not None:
+            self.stats.deduplicated += 1
+            logger.debug(strings.LOG_EXECUTOR_DEDUPLICATED.format(key=key))
+            if priority < existing.priority:
+                existing.cancelled = True
+                action = QueuedAction(priority, next(self._seq), key, existing.factory, existing.future,
+                                      existing.enqueued_at)
+                self._enqueue(action)
+            return existing.future
+
+        action = QueuedAction(priority, next(self._seq), key, factory, asyncio.get_running_loop().create_future())
+        self.stats.submitted += 1
+        self._enqueue(action)
+        return action.future
+
+    def _enqueue(self, action: QueuedAction):
+        self._pending[action.key] = action
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+        self._queue.put_nowait(action)
+
+    def cancel(self, key: str, running: bool = True) -> bool:
+        action = self._pending.pop(key, None)
+        if action is not None:
+            action.cancelled = True
+            action.future.cancel()
+            self.stats.cancelled += 1
+            return True
+        if running and self.current is not None and self.current.key == key and self._current_task:
+            self.current.cancelled = True
+            self._current_task.cancel()
+            return True
+        return False
+
+    def cancel_all(self, below: ActionPriority | None = None) -> int:
+        keys = [key for key, action in self._pending.items() if below is None or action.priority > below]
+        return sum(self.cancel(key) for key in keys)
+
+    def rest(self, seconds: float, on_wake: Callable[[], None] | None = None):
+        if self._rest_handle:
+            self._rest_handle.cancel()
+        self._awake.clear()
+        self.resting_until = time.monotonic() + seconds
+        self._rest_handle = asyncio.get_running_loop().call_later(seconds, self._wake, on_wake)
+
+    def _wake(self, on_wake: Callable[[], None] | None):
+        self._rest_handle = None
+        self.resting_until = None
+        if on_wake:
+            on_wake()
+        self._awake.set()
+
+    async def _run(self):
+        while True:
+            await self._awake.wait()
+            action = await self._queue.get()
+            if action.cancelled:
+                continue
+            if not self._awake.is_set():
+                self._queue.put_nowait(action)
+                continue
+
+            del self._pending[action.key]
+            self.current = action
+            wait = time.monotonic() - action.enqueued_at
+            self.stats.record_wait(ActionPriority(action.priority), wait)
+            self._current_task = asyncio.create_task(action.factory())
+            try:
+                result = await self._current_task
+            except asyncio.CancelledError:
+                action.future.cancel()
+                if not action.cancelled:
+                    raise
+                self.stats.cancelled += 1
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(strings.LOG_EXECUTOR_ACTION_FAILED.format(key=action.key, e=e))
+                if not action.future.done():
+                    action.future.set_result(None)
+            else:
+                self.stats.executed += 1
+                if not action.future.done():
+                    action.future.set_result(result)
+            finally:
+                self.current = None
+                self._current_task = None
+
+    def describe_stats(self) -> str:
+        waits = ", ".join(f"{priority.name.lower()} {self.stats.average_wait(priority):.1f}s avg / "
+                          f"{self.stats.waits[priority][2]:.1f}s max" for priority in sorted(self.stats.waits))
+        return strings.LOG_EXECUTOR_STATS.format(depth=self.depth, max_depth=self.stats.max_depth,
+                                                 executed=self.stats.executed,
+                                                 deduplicated=self.stats.deduplicated,
+                                                 cancelled=self.stats.cancelled, failed=self.stats.failed,
+                                                 waits=waits or "-")
@@ -1,9 +1,12 @@
 import asyncio
+import time
+from collections import deque
 from telethon import TelegramClient, events
 from telethon.tl.custom.message import Message
 from .models import strings, ActionMode
 from .logger import logger
 from .utils import human_delay
+from .scheduler import OutboundScheduler
 
 ASYNCIO_TIMEOUT = 5
 
@@ -14,6 +17,9 @@ class Interactor:
         self.target_bot_id = config["target_bot_id"]
         self.new_message_queue = asyncio.Queue()
         self.edited_message_queues = {}
+        self.scheduler = OutboundScheduler(app, config)
+        self.actions = 0
+        self.latencies = deque(maxlen=10000)
 
         self.app.add_event_handler(self._on_new_message, events.NewMessage(chats=self.target_bot_id))
         self.app.add_event_handler(self._on_message_edited, events.MessageEdited(chats=self.target_bot_id))
@@ -68,22 +74,30 @@ class Interactor:
             logger.warning(strings.LOG_INTERACTOR_TIMEOUT_MESSAGE_EDIT.format(message_id=message_id))
             raise TimeoutError(strings.ERROR_ANSWER_TIMEOUT)
         finally:
-            self.edited_message_queues.pop(message_id, None)
+            if self.edited_message_queues.get(message_id) is edit_queue:
+                del self.edited_message_queues[message_id]
 
     async def execute_action(self, action: ActionMode, message: str = None, button_text: str = None,
                              original_message: Message = None) -> Message | None:
+        started = time.monotonic()
+        try:
+            return await self._execute_action(action, message, button_text, original_message)
+        finally:
+            self.actions += 1
+            self.latencies.append(time.monotonic() - started)
+
+    async def _execute_action(self, action: ActionMode, message: str = None, button_text: str = None,
+                              original_message: Message = None) -> Message | None:
         await human_delay()
 
-        self._clear_new_message_queue()
         if action == ActionMode.SEND:
-            logger.debug(strings.LOG_INTERACTOR_CLEARED_NEW_MESSAGE_QUEUE_SEND)
-        elif action == ActionMode.CLICK:
-            logger.debug(strings.LOG_INTERACTOR_CLEARED_NEW_MESSAGE_QUEUE_CLICK)
+            def clear_queue():
+                self._clear_new_message_queue()
+                logger.debug(strings.LOG_INTERACTOR_CLEARED_NEW_MESSAGE_QUEUE_SEND)
 
-        if action == ActionMode.SEND:
             logger.debug(
                 strings.LOG_INTERACTOR_SENDING_MESSAGE.format(target_bot_id=self.target_bot_id, message=message))
-            await self.app.send_message(self.target_bot_id, message)
+            await self.scheduler.send_message(self.target_bot_id, message, before_send=clear_queue)
             return await self._wait_for_new_message(timeout=ASYNCIO_TIMEOUT)
 
         elif action == ActionMode.CLICK:
@@ -93,24 +107,32 @@ class Interactor:
             logger.debug(
                 strings.LOG_INTERACTOR_ATTEMPTING_CLICK.format(button_text=button_text, message_id=original_message.id))
 
-            task_new = asyncio.create_task(self._wait_for_new_message(timeout=None))
-            task_edit = asyncio.create_task(self._wait_for_message_edit(original_message.id, timeout=None))
-            response_tasks = {task_new, task_edit}
+            response_tasks = set()
 
-            task_click = asyncio.create_task(original_message.click(text=button_text))
+            def arm_waiters():
+                for t in response_tasks: t.cancel()
+                response_tasks.clear()
+                self._clear_new_message_queue()
+                logger.debug(strings.LOG_INTERACTOR_CLEARED_NEW_MESSAGE_QUEUE_CLICK)
+                response_tasks.add(asyncio.create_task(self._wait_for_new_message(timeout=None)))
+                response_tasks.add(asyncio.create_task(self._wait_for_message_edit(original_message.id, timeout=None)))
+                logger.debug(strings.LOG_INTERACTOR_CREATED_WAITERS.format(message_id=original_message.id))
 
-            logger.debug(strings.LOG_INTERACTOR_CREATED_WAITERS.format(message_id=original_message.id))
+            task_click = asyncio.create_task(self.scheduler.click(original_message, button_text,
+                                                                  before_send=arm_waiters))
             logger.debug(strings.LOG_INTERACTOR_AWAITING_CLICK.format(button_text=button_text))
 
-            all_tasks = response_tasks | {task_click}
             click_successful = False
 
             try:
                 while True:
+                    all_tasks = response_tasks if click_successful else response_tasks | {task_click}
                     done, pending = await asyncio.wait(all_tasks, return_when=asyncio.FIRST_COMPLETED,
                                                        timeout=ASYNCIO_TIMEOUT)
 
                     if not done:
+                        if not click_successful and self.scheduler.is_throttling:
+                            continue
                         if click_successful:
                             for t in all_tasks: t.cancel()
                             await asyncio.gather(*all_tasks, return_exceptions=True)
@@ -124,7 +146,6 @@ class Interactor:
                                 await task
                                 logger.debug(strings.LOG_INTERACTOR_CLICK_SENT_SUCCESS.format(button_text=button_text))
                                 click_successful = True
-                                all_tasks.remove(task_click)
                             except Exception as e:
                                 logger.error(strings.LOG_INTERACTOR_CLICK_FAILED.format(e=e))
                                 if "Could not find any button" in str(e):
@@ -144,6 +165,7 @@ class Interactor:
                             return result_msg
 
             except Exception as e:
+                all_tasks = response_tasks | {task_click}
                 for t in all_tasks:
                     t.cancel()
                 await asyncio.gather(*all_tasks, return_exceptions=True)
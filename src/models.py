@@ -1,6 +1,7 @@
+import time
 from dataclasses import dataclass, field
-from enum import Enum, auto
-from typing import Optional, Dict, Any, List
+from enum import Enum, IntEnum, auto
+from typing import Optional, Dict, Any, List, Union
 
 class MessageType(Enum):
     NEW_CARD = auto()
@@ -14,10 +15,111 @@ class ActionMode(Enum):
     SEND = auto()
     CLICK = auto()
 
-@dataclass
+class ShopAction(Enum):
+    BUY = auto()
+    USE = auto()
+
+class ActionPriority(IntEnum):
+    CARD_CLAIM = 0
+    BOOSTER_USE = 1
+    PROFILE_REFRESH = 2
+
+class Rarity(IntEnum):
+    UNKNOWN = 0
+    COMMON = 1
+    RARE = 2
+    SUPER_RARE = 3
+    EPIC = 4
+    MYTHIC = 5
+    LEGENDARY = 6
+    CHROMATIC = 7
+    LIMITED = 8
+
+    @property
+    def label(self) -> str:
+        return strings.RARITY_LABELS.get(self.name, strings.RARITY_LABELS["UNKNOWN"])
+
+    @classmethod
+    def from_label(cls, label: str) -> "Rarity":
+        return RARITY_BY_LABEL.get(label.strip(), cls.UNKNOWN)
+
+@dataclass(slots=True)
+class CardRecord:
+    name: str
+    rarity: Rarity
+    total_points: int
+    total_coins: int
+    luck_boosted: bool = False
+    rarity_label: str = ""
+
+@dataclass(slots=True)
+class ProfileRecord:
+    total_coins: int
+
+@dataclass(slots=True)
+class CooldownRecord:
+    seconds: int
+
+MessageRecord = Union[CardRecord, ProfileRecord, CooldownRecord]
+
+@dataclass(slots=True)
 class ParsedMessage:
     type: MessageType
-    details: Optional[Dict[str, Any]] = None
+    record: Optional[MessageRecord] = None
+
+@dataclass
+class ShopOperation:
+    action: ShopAction
+    booster_name: str
+    quantity: int = 1
+
+@dataclass
+class ShopOperationResult:
+    operation: ShopOperation
+    completed: int = 0
+    status: bool | str = False
+    balance: Optional[int] = None
+
+@dataclass
+class BoosterInfo:
+    name: str
+    count: Optional[int] = None
+    price: Optional[int] = None
+    active: bool = False
+
+@dataclass
+class InventorySnapshot:
+    boosters: Dict[str, BoosterInfo] = field(default_factory=dict)
+    balance: Optional[int] = None
+    taken_at: float = field(default_factory=time.monotonic)
+
+    def get(self, name: str) -> Optional[BoosterInfo]:
+        if name in self.boosters:
+            return self.boosters[name]
+        return next((info for key, info in self.boosters.items() if key.startswith(name)), None)
+
+    def count(self, name: str) -> int:
+        info = self.get(name)
+        return info.count or 0 if info else 0
+
+    def is_active(self, name: str) -> bool:
+        info = self.get(name)
+        return info.active if info else False
+
+    def merge(self, boosters: Dict[str, BoosterInfo]):
+        for name, info in boosters.items():
+            existing = self.boosters.setdefault(name, BoosterInfo(name))
+            existing.count = info.count if info.count is not None else existing.count
+            existing.price = info.price if info.price is not None else existing.price
+            existing.active = existing.active or info.active
+
+    def adjust(self, name: str, delta: int):
+        info = self.get(name) or self.boosters.setdefault(name, BoosterInfo(name))
+        info.count = max(0, (info.count or 0) + delta)
+
+    def describe(self) -> str:
+        return ", ".join(f"{info.name}: {info.count or 0}" + (f" ({info.price} 💰)" if info.price is not None else "")
+                         + (" [active]" if info.active else "") for info in self.boosters.values()) or "-"
 
 @dataclass
 class Strings:
@@ -42,6 +144,26 @@ class Strings:
     KEYWORD_BOUGHT: str = "куплен"
     KEYWORD_ACTIVATED: str = "активирован"
     KEYWORD_INVENTORY: str = "Инвентарь"
+    KEYWORD_BOOSTER_ACTIVE: str = "активен"
+    KEYWORD_PIECES: str = "шт"
+    KEYWORD_CARD_NEW_HEADER: str = "ваша!"
+    KEYWORD_CARD_DUPLICATE_HEADER: str = "уже у вас!"
+
+    RARITY_LABELS: Dict[str, str] = field(default_factory=lambda: {
+        "UNKNOWN": "Неизвестная",
+        "COMMON": "Обычная",
+        "RARE": "Редкая",
+        "SUPER_RARE": "Сверхредкая",
+        "EPIC": "Эпическая",
+        "MYTHIC": "Мифическая",
+        "LEGENDARY": "Легендарная",
+        "CHROMATIC": "Хроматическая",
+        "LIMITED": "Лимитированная"
+    })
+
+    CARD_NEW_EMOJI: str = "🌟"
+    CARD_DUPLICATE_EMOJI: str = "🔄"
+    COINS_EMOJI: str = "💰"
 
     BTN_INVENTORY: str = "🎒 Инвентарь"
     BTN_BOOSTERS: str = "⚡️ Бустеры"
@@ -53,8 +175,6 @@ class Strings:
     BOOSTER_TIME: str = "Ускоритель времени"
 
     LOG_ANALYZING_STATE: str = "analyzing the initial state..."
-    LOG_INITIAL_STATE_COOLDOWN: str = "initial state is cooldown. handling it..."
-    LOG_INITIAL_STATE_CLEAR: str = "initial state is clear. starting normal flow..."
     LOG_UPDATING_BALANCE: str = "updating balance using profile..."
     LOG_BALANCE_UPDATED: str = "balance updated: {coins} 💰"
     LOG_PROFILE_NO_TEXT: str = "profile message has no text, can't update balance."
@@ -65,7 +185,6 @@ class Strings:
     LOG_GOT_CARD: str = "got card: '{name}'. balance: {coins} 💰"
     LOG_COOLDOWN: str = "cooldown: {h}h {m}m {s}s"
     LOG_COOLDOWN_USE_BOOSTER: str = "cooldown >1 hour, bot decided to use time booster..."
-    LOG_CHECKING_NEW_COOLDOWN: str = "checking new cooldown..."
     LOG_COOLDOWN_WAIT: str = "bot decided to not use time booster and wait."
     LOG_WAITING_SECS: str = "waiting {seconds} secs..."
     LOG_SENDING_CARD_MESSAGE: str = "sending card message"
@@ -92,6 +211,75 @@ class Strings:
     LOG_SHOP_TIMEOUT_AFTER_CLICK = "timeout after click on '{name}' - may be alert"
     LOG_SHOP_REUSING_MESSAGE = "reusing message '{message_id}' for activation"
 
+    LOG_CATALOG_LOADED: str = "card catalog loaded: {count} cards from {path}"
+    LOG_CATALOG_LOAD_ERROR: str = "failed to load card catalog {path}: {e}"
+    LOG_CATALOG_BACKFILLING: str = "card catalog is empty, backfilling from last {limit} messages..."
+    LOG_CATALOG_BACKFILLED: str = "card catalog backfilled: {added} cards from {scanned} messages."
+    LOG_CATALOG_NEW_CARD: str = "card '{name}' added to catalog ({total} cards)."
+    LOG_CATALOG_STATS: str = "card resolution: {cards} cards, {model_calls} model calls ({reduction:.0%} avoided), avg catalog lookup {lookup_ns:.0f}ns"
+
+    LOG_OUTBOUND_FLOOD_WAIT: str = "flood wait for {seconds}s, pausing outbound messages for this account."
+    LOG_OUTBOUND_FLOOD_WAIT_TOO_LONG: str = "flood wait for {seconds}s exceeds max_flood_wait_seconds, giving up."
+    LOG_OUTBOUND_MERGED: str = "merged duplicate pending send: '{message}'"
+    LOG_OUTBOUND_STATS: str = "outbound: {sends} sends, {clicks} clicks, {merged} merged, {rate:.2f}/min ({last_minute} last minute), {flood_waits} flood waits ({flood_wait_seconds:.0f}s)"
+
+    LOG_LOOP_LAG: str = "event loop lag: {lag_ms:.0f}ms"
+    LOG_LOOP_STALL_STACK: str = "event loop blocked for {seconds:.2f}s, current stack:\n{stack}"
+    LOG_LOOP_LAG_SUMMARY: str = "loop lag: {samples} samples, p50 {p50:.0f}ms, p99 {p99:.0f}ms, max {max:.0f}ms, {stalls} stalls, histogram {buckets}"
+    LOG_PROFILER_STARTED: str = "sampling profiler started for {seconds}s"
+    LOG_PROFILER_ALREADY_RUNNING: str = "sampling profiler is already running."
+    LOG_PROFILER_WRITTEN: str = "profile written ({samples} samples): {path}. top: {top}"
+
+    LOG_RECORDER_STARTED: str = "recording bot traffic to {path}"
+    LOG_RECORDER_TRUNCATED_LOG: str = "traffic log {path} is truncated after {count} records: {e}"
+    LOG_REPLAY_DIVERGED: str = "replay diverged at outgoing #{index}: expected {expected}, got {actual}"
+    LOG_REPLAY_WAIT_TIMEOUT: str = "replay: bot did not produce outgoing #{index} ({expected}) in time, feeding anyway"
+
+    LOG_SHOP_TRANSACTION: str = "shop transaction: {operations}"
+    LOG_SHOP_TRANSACTION_RESULT: str = "shop transaction finished: {results}"
+    LOG_SHOP_TRANSACTION_ERROR: str = "error during shop transaction: {e}"
+    LOG_SHOP_USE_CAPPED: str = "only {available} of {quantity} '{name}' available, activating {available}."
+    LOG_SHOP_BALANCE_PARSED: str = "balance from shop screen: {coins} 💰"
+
+    LOG_COOLDOWN_PREDICTION_ERROR: str = "cooldown prediction was off by {error:.0f}s, corrected from refusal."
+    LOG_COOLDOWN_PERIOD_LEARNED: str = "observed cooldown period: {seconds}s"
+    LOG_COOLDOWN_PROBE_STATS: str = "card command probes today: {probes}, wasted on cooldown: {wasted}, period: {period}s"
+    LOG_COOLDOWN_REDUCTION_LEARNED: str = "observed time booster reduction: {seconds}s"
+    LOG_ACCOUNT_TRANSITION: str = "account state: {old} -> {new}"
+    LOG_ACCOUNT_CLAIM_SKIPPED: str = "not sending card command while {state}, ready in {seconds} secs."
+    LOG_ACCOUNT_RESTORED: str = "restored account state from checkpoint: {state}, ready in {seconds} secs."
+    LOG_ACCOUNT_STATS: str = "account is {state}; transitions: {transitions}; time/actions per state: {states}"
+
+    LOG_CHECKPOINT_LOAD_ERROR: str = "failed to load message checkpoint {path}: {e}"
+    LOG_CHECKPOINT_SAVE_ERROR: str = "failed to save message checkpoint {path}: {e}"
+    LOG_CATCHUP_INITIAL: str = "no checkpoint yet, reading the last {limit} messages to restore account state..."
+    LOG_CATCHUP_FETCHING: str = "catching up on messages after #{last_id}..."
+    LOG_CATCHUP_TRUNCATED: str = "more than {limit} messages were missed, replaying only the newest {limit}."
+    LOG_CATCHUP_DONE: str = "caught up on {count} missed messages ({cards} cards, {cooldowns} cooldowns) in {elapsed:.2f}s."
+    LOG_CATCHUP_RECONNECTED: str = "connection restored, catching up on missed messages..."
+    LOG_CATCHUP_ERROR: str = "failed to catch up on missed messages: {e}"
+
+    LOG_EXECUTOR_DEDUPLICATED: str = "action '{key}' is already queued, skipping duplicate."
+    LOG_EXECUTOR_ACTION_FAILED: str = "action '{key}' failed: {e}"
+    LOG_EXECUTOR_STATS: str = "actions: {depth} queued (max {max_depth}), {executed} done, {deduplicated} deduplicated, {cancelled} cancelled, {failed} failed; waits: {waits}"
+    LOG_BOT_RESTING_QUEUED: str = "bot is resting, queued actions will run after waking up."
+
+    LOG_SHOP_READING_INVENTORY: str = "reading boosters inventory..."
+    LOG_SHOP_INVENTORY_SNAPSHOT: str = "boosters inventory: {boosters}"
+
+    LOG_INFERENCE_PROFILE_APPLIED: str = "applied inference profile {path}: {threads} threads, {precision}, batch {batch_size}"
+    LOG_INFERENCE_PROFILE_CORE_MISMATCH: str = "inference profile {path} was tuned for {profiled} cores but this host has {cores}. re-run 'python -m src.nn.autotune'."
+
+    LOG_MODEL_RELOAD_REQUESTED: str = "reloading [model] settings..."
+    LOG_MODEL_NOT_LOADED: str = "classifier is not loaded yet, new settings will be used when it is."
+    LOG_MODEL_CANDIDATE_LOADING: str = "loading candidate classifier {path} in background..."
+    LOG_MODEL_CANDIDATE_LOADED: str = "candidate classifier {path} loaded (shadow: {shadow})"
+    LOG_MODEL_LOAD_FAILED: str = "failed to load classifier {path}: {e}"
+    LOG_MODEL_PROMOTED: str = "classifier {path} is now live. {stats}"
+    LOG_MODEL_ROLLED_BACK: str = "rolled back to classifier {path}"
+    LOG_MODEL_SHADOW_DISAGREEMENT: str = "shadow disagreement: live {live} ({live_confidence:.2f}), candidate {candidate} ({candidate_confidence:.2f}): {text}"
+    LOG_MODEL_SHADOW_STATS: str = "shadow {candidate} vs live {live}: {compared} compared, {skipped} skipped while busy, {disagreements} disagreements ({rate:.2%}), latency delta {delta:+.2f}ms/message"
+
     LOG_NAVIGATION_BACK: str = "navigation: step back ({current}/{total})"
     
     ERROR_NO_REPLY_MARKUP: str = "message doesn't have reply markup"
@@ -100,11 +288,8 @@ class Strings:
 
     LOG_RESOLVED_TARGET_BOT_ID: str = "resolved target bot ID: {target_bot_id}"
     LOG_FAILED_RESOLVE_TARGET_BOT_ID: str = "failed to resolve target bot ID: {e}"
-    LOG_COOLDOWN_TASK_CANCELLED_EXISTING: str = "cancelled existing cooldown task."
-    LOG_COOLDOWN_TASK_CANCELLED_REDUCTION: str = "cancelled existing cooldown task due to reduction."
     LOG_COOLDOWN_NEW_DURATION: str = "new cooldown duration: {h}h {m}m {s}s"
     LOG_COOLDOWN_CLEARED_SENDING_CMD: str = "cooldown cleared. starting 'decide_and_act()' sequence"
-    LOG_COOLDOWN_REDUCED_IGNORED_AUTO: str = "cooldown reduced message ignored in automatic mode."
 
     LOG_INTERACTOR_NEW_MESSAGE_EVENT: str = "Caught new message event: {message_id} in chat {chat_id}"
     LOG_INTERACTOR_EDITED_MESSAGE_EVENT: str = "Caught message edited event: {message_id} in chat {chat_id}. Monitored IDs: {monitored_ids}"
@@ -134,3 +319,5 @@ class Strings:
     LOG_SHOP_MESSAGE_CONTENT_BEFORE_CLICK: str = "Message content before clicking '{action_button}':\n{message_text}"
 
 strings = Strings()
+
+RARITY_BY_LABEL: Dict[str, Rarity] = {label: Rarity[name] for name, label in strings.RARITY_LABELS.items()}
@@ -0,0 +1,225 @@
+import asyncio
+import bisect
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from .logger import logger
+from .models import strings
+
+LAG_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+DEFAULT_PROFILE_DIR = "./data/profiles"
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+class LagHistogram:
+    def __init__(self, buckets_ms: list[int] = LAG_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def record(self, lag_ms: float):
+        self.counts[bisect.bisect_left(self.buckets_ms, lag_ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.buckets_ms[i], self.max_ms) if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, threshold_ms: float = 500, report_interval: float = 600):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.report_interval = report_interval
+        self.histogram = LagHistogram()
+        self.stalls = 0
+        self.loop_thread_id = None
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat = None
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self._heartbeat = time.monotonic()
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self.histogram.record(lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self.stalls += 1
+                logger.warning(strings.LOG_LOOP_LAG.format(lag_ms=lag_ms))
+            if now - last_report >= self.report_interval:
+                last_report = now
+                logger.info(self.describe())
+
+    def _watch(self):
+        threshold = self.threshold_ms / 1000
+        while not self._stopped.wait(threshold / 2):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < threshold + self.interval or heartbeat == self._reported_heartbeat:
+                continue
+            self._reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(strings.LOG_LOOP_STALL_STACK.format(
+                seconds=time.monotonic() - heartbeat, stack=stack))
+
+    def describe(self) -> str:
+        return strings.LOG_LOOP_LAG_SUMMARY.format(samples=self.histogram.total, p50=self.histogram.percentile(0.5),
+                                                   p99=self.histogram.percentile(0.99), max=self.histogram.max_ms,
+                                                   stalls=self.stalls, buckets=self.histogram.as_dict())
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: int, interval: float = 0.005, output_dir: str = DEFAULT_PROFILE_DIR):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.output_dir = output_dir
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float) -> bool:
+        if self.running:
+            logger.warning(strings.LOG_PROFILER_ALREADY_RUNNING)
+            return False
+        self._thread = threading.Thread(target=self._sample, args=(seconds,), name="sampling-profiler",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def _sample(self, seconds: float):
+        logger.info(strings.LOG_PROFILER_STARTED.format(seconds=seconds))
+        stacks = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stacks[";".join(reversed(stack))] += 1
+                samples += 1
+            time.sleep(self.interval)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        top = ", ".join(f"{leaf} ({count / samples:.0%})" for leaf, count in leaves.most_common(5)) if samples else ""
+        logger.info(strings.LOG_PROFILER_WRITTEN.format(samples=samples, path=path, top=top))
+
+
+class Diagnostics:
+    def __init__(self, config: dict):
+        self.settings = config.get("diagnostics", {})
+        self.lag_monitor = None
+        self.profiler = None
+        self._trigger_task = None
+
+    def start(self):
+        thread_id = threading.get_ident()
+        if self.settings.get("loop_lag_monitor", True):
+            self.lag_monitor = LoopLagMonitor(threshold_ms=self.settings.get("lag_threshold_ms", 500),
+                                              report_interval=self.settings.get("lag_report_interval_seconds", 600))
+            self.lag_monitor.start()
+
+        self.profiler = SamplingProfiler(thread_id, output_dir=self.settings.get("profile_dir", DEFAULT_PROFILE_DIR))
+        if self.settings.get("profile_signal", True) and hasattr(signal, "SIGUSR1"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.start_profile)
+            except (NotImplementedError, RuntimeError):
+                pass
+        if self.settings.get("profile_trigger_file"):
+            self._trigger_task = asyncio.create_task(self._watch_trigger_file(self.settings["profile_trigger_file"]))
+
+    def start_profile(self, seconds: float | None = None):
+        self.profiler.start(seconds or self.settings.get("profile_seconds", 30))
+
+    async def _watch_trigger_file(self, path: str):
+        while True:
+            await asyncio.sleep(1)
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        content = f.read().strip()
+                    os.remove(path)
+                except OSError:
+                    continue
+                self.start_profile(float(content) if content.replace(".", "", 1).isdigit() else None)
@@ -0,0 +1,33 @@
+import os
+import time
+
+import torch
+
+MODEL_NAME = 'DeepPavlov/rubert-base-cased'
+DEFAULT_LABELS = ["duplicate_card", "new_card", "card_message"]
+ARTIFACT_FORMAT = "card_classifier"
+
+
+def save_artifact(path: str, model: torch.nn.Module, labels: list[str], model_name: str = MODEL_NAME,
+                  num_layers: int | None = None, **meta):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    torch.save({
+        "format": ARTIFACT_FORMAT,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model_name": model_name,
+        "num_layers": num_layers,
+        "labels": list(labels),
+        "meta": meta,
+        "state_dict": model.state_dict(),
+    }, path)
+
+
+def load_artifact(path: str, device: torch.device | str = 'cpu') -> tuple[dict, dict]:
+    obj = torch.load(path, map_location=device)
+    if isinstance(obj, dict) and obj.get("format") == ARTIFACT_FORMAT:
+        state_dict = obj.pop("state_dict")
+        return state_dict, obj
+    return obj, {"format": "state_dict", "model_name": MODEL_NAME, "num_layers": None, "labels": DEFAULT_LABELS,
+                 "meta": {}}
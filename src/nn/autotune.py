@@ -0,0 +1,134 @@
+import argparse
+import copy
+import os
+import platform
+import statistics
+import time
+
+import torch
+from transformers import AutoTokenizer, logging
+
+from .artifact import load_artifact
+from .dataset import load_texts, DEFAULT_MESSAGES_PATH
+from .hardware import (DEFAULT_PROFILE_PATH, available_precisions, host_cpu_count, inference_context, prepare_model,
+                       save_profile)
+from .model import CardClassifier
+from .predict import DEFAULT_MODEL_PATH
+from ..sim import samples
+
+logging.set_verbosity_error()
+
+MAX_LENGTH = 512
+
+
+def thread_candidates(cores: int) -> list[int]:
+    candidates = {cores}
+    n = 1
+    while n < cores:
+        candidates.add(n)
+        n *= 2
+    return sorted(candidates)
+
+
+def predictions(model: CardClassifier, encodings: list[dict], precision: str) -> torch.Tensor:
+    outputs = []
+    with torch.inference_mode(), inference_context(precision):
+        for enc in encodings:
+            outputs.append(model(enc['input_ids'], enc['attention_mask']).float().argmax(dim=1))
+    return torch.cat(outputs)
+
+
+def measure_batch_ms(model: CardClassifier, enc: dict, precision: str, repeats: int) -> float:
+    timings = []
+    with torch.inference_mode(), inference_context(precision):
+        model(enc['input_ids'], enc['attention_mask'])
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model(enc['input_ids'], enc['attention_mask'])
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.nn.autotune",
+                                     description="benchmark CardClassifier inference settings on this machine")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--messages", default=DEFAULT_MESSAGES_PATH,
+                        help="messages used for timing and agreement checks (built-in samples if missing)")
+    parser.add_argument("--threads", type=int, nargs="+", help="intra-op thread counts (default: powers of two)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--precisions", nargs="+", choices=["fp32", "bf16", "int8"])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-latency-ms", type=float, default=250.0,
+                        help="ignore configurations whose batch takes longer than this")
+    parser.add_argument("--min-agreement", type=float, default=0.99,
+                        help="minimum agreement with fp32 predictions for reduced precisions")
+    parser.add_argument("--output", default=DEFAULT_PROFILE_PATH)
+    args = parser.parse_args()
+
+    cores = host_cpu_count()
+    texts = load_texts(args.messages) if os.path.exists(args.messages) else list(samples.MESSAGES.values())
+    texts = texts[:max(args.batch_sizes) * 4]
+    print(f"{cores} usable cores, {len(texts)} messages, torch {torch.__version__}")
+
+    state_dict, meta = load_artifact(args.model, 'cpu')
+    tokenizer = AutoTokenizer.from_pretrained(meta["model_name"])
+    base = CardClassifier(num_classes=len(meta["labels"]), model_name=meta["model_name"],
+                          num_layers=meta["num_layers"])
+    base.load_state_dict(state_dict)
+    base.eval()
+
+    eval_encodings = [tokenizer(texts[i:i + 16], truncation=True, padding=True, max_length=MAX_LENGTH,
+                                return_tensors='pt') for i in range(0, len(texts), 16)]
+    batches = {bs: tokenizer((texts * (bs // len(texts) + 1))[:bs], truncation=True, padding=True,
+                             max_length=MAX_LENGTH, return_tensors='pt') for bs in args.batch_sizes}
+    reference = predictions(base, eval_encodings, "fp32")
+
+    supported = available_precisions()
+    precisions = [p for p in (args.precisions or supported) if p in supported]
+    results = []
+    for precision in precisions:
+        model = prepare_model(copy.deepcopy(base), precision)
+        agreement = float((predictions(model, eval_encodings, precision) == reference).float().mean())
+        for threads in args.threads or thread_candidates(cores):
+            torch.set_num_threads(threads)
+            for batch_size, enc in batches.items():
+                batch_ms = measure_batch_ms(model, enc, precision, args.repeats)
+                result = {"precision": precision, "threads": threads, "batch_size": batch_size,
+                          "batch_ms": batch_ms, "per_message_ms": batch_ms / batch_size,
+                          "throughput": batch_size / batch_ms * 1000, "agreement": agreement}
+                results.append(result)
+                print(f"{precision:>5} threads {threads:>3} batch {batch_size:>3}: {batch_ms:>9.1f}ms/batch "
+                      f"{result['throughput']:>8.1f} msg/s  agreement {agreement:.2%}")
+        del model
+
+    eligible = [r for r in results if r["batch_ms"] <= args.max_latency_ms
+                and (r["precision"] == "fp32" or r["agreement"] >= args.min_agreement)]
+    if not eligible:
+        eligible = [r for r in results if r["precision"] == "fp32"]
+    best = max(eligible, key=lambda r: r["throughput"])
+
+    save_profile(args.output, {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": cores,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "torch_version": torch.__version__,
+        "model": args.model,
+        "model_name": meta["model_name"],
+        "num_layers": meta["num_layers"],
+        "threads": best["threads"],
+        "interop_threads": 1,
+        "batch_size": best["batch_size"],
+        "precision": best["precision"],
+        "throughput": best["throughput"],
+        "batch_ms": best["batch_ms"],
+        "results": results,
+    })
+    print(f"best: {best['precision']} with {best['threads']} threads, batch {best['batch_size']} "
+          f"({best['throughput']:.1f} msg/s, {best['batch_ms']:.1f}ms/batch)")
+    print(f"profile written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class InferenceBatcher:
+    def __init__(self, predict: Callable[[list[str]], list[dict]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5):
+        self.predict_batch = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.requests = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.in_flight = 0
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flusher: asyncio.Task | None = None
+        self._full = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending) + self.in_flight
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+    async def predict(self, text: str) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            self.in_flight = len(batch)
+            self.batches += 1
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_batch, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self.in_flight = 0
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import json
+import os
+
+DEFAULT_MESSAGES_PATH = './data/messages.jsonl'
+
+
+def load_texts(path: str = DEFAULT_MESSAGES_PATH) -> list[str]:
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                text = json.loads(line).get("text")
+                if text:
+                    texts.append(text)
+    return texts
+
+
+async def export_history(output: str = DEFAULT_MESSAGES_PATH, limit: int | None = 5000) -> int:
+    from telethon import TelegramClient
+    from ..config_manager import get_config
+    from ..utils import get_message_text
+
+    config = get_config()
+    app = TelegramClient("my_account", config["api_id"], config["api_hash"])
+    await app.start()
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    exported = 0
+    try:
+        with open(output, "w", encoding="utf-8") as f:
+            async for msg in app.iter_messages(config["target_bot_id"], limit=limit):
+                text = get_message_text(msg)
+                if not text or msg.out:
+                    continue
+                f.write(json.dumps({"id": msg.id, "date": msg.date.timestamp(), "text": text},
+                                   ensure_ascii=False) + "\n")
+                exported += 1
+    finally:
+        await app.disconnect()
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.nn.dataset",
+                                     description="export messages from the target bot chat for training")
+    parser.add_argument("--output", default=DEFAULT_MESSAGES_PATH)
+    parser.add_argument("--limit", type=int, default=5000)
+    args = parser.parse_args()
+    exported = asyncio.run(export_history(args.output, args.limit or None))
+    print(f"exported {exported} messages to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import contextlib
+import json
+import os
+
+import torch
+
+DEFAULT_PROFILE_PATH = "./data/inference_profile.json"
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+def host_cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def available_precisions() -> list[str]:
+    precisions = ["fp32"]
+    try:
+        with torch.autocast("cpu", dtype=torch.bfloat16):
+            torch.nn.functional.linear(torch.ones(2, 2), torch.ones(2, 2))
+        precisions.append("bf16")
+    except (RuntimeError, TypeError):
+        pass
+    if any(engine != "none" for engine in torch.backends.quantized.supported_engines):
+        precisions.append("int8")
+    return precisions
+
+
+def prepare_model(model: torch.nn.Module, precision: str) -> torch.nn.Module:
+    if precision == "int8":
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def inference_context(precision: str):
+    if precision == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def apply_threads(threads: int | None, interop_threads: int | None = None):
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            pass
+
+
+def load_profile(path: str | None) -> dict | None:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_profile(path: str, profile: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from ..logger import logger
+from ..models import strings
+
+
+@dataclass
+class ShadowStats:
+    compared: int = 0
+    skipped: int = 0
+    disagreements: int = 0
+    live_ms: float = 0.0
+    candidate_ms: float = 0.0
+
+    @property
+    def disagreement_rate(self) -> float:
+        return self.disagreements / self.compared if self.compared else 0.0
+
+    @property
+    def mean_latency_delta_ms(self) -> float:
+        return (self.candidate_ms - self.live_ms) / self.compared if self.compared else 0.0
+
+
+class HotSwapPredictor:
+    def __init__(self, loader: Callable[[str], object], path: str, shadow: bool = True, report_every: int = 100):
+        self.loader = loader
+        self.shadow = shadow
+        self.report_every = report_every
+
+        self.live = loader(path)
+        self.live_path = path
+        self.previous = None
+        self.previous_path = None
+        self.candidate = None
+        self.candidate_path = None
+        self.stats = ShadowStats()
+
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+        self._shadow = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-shadow")
+        self._shadow_busy = threading.Semaphore(1)
+        self._loading_path = None
+
+    def predict(self, texts):
+        live, candidate = self.live, self.candidate if self.shadow else None
+        started = time.perf_counter()
+        results = live.predict(texts)
+        live_ms = (time.perf_counter() - started) * 1000
+        if candidate is not None:
+            if self._shadow_busy.acquire(blocking=False):
+                self._shadow.submit(self._compare, candidate, texts, results, live_ms)
+            else:
+                self.stats.skipped += 1 if isinstance(texts, str) else len(texts)
+        return results
+
+    def _compare(self, candidate, texts, live_results, live_ms: float):
+        started = time.perf_counter()
+        try:
+            candidate_results = candidate.predict(texts)
+        finally:
+            self._shadow_busy.release()
+        candidate_ms = (time.perf_counter() - started) * 1000
+        if isinstance(texts, str):
+            texts, live_results, candidate_results = [texts], [live_results], [candidate_results]
+
+        with self._lock:
+            if candidate is not self.candidate:
+                return
+            stats = self.stats
+            stats.compared += len(texts)
+            stats.live_ms += live_ms
+            stats.candidate_ms += candidate_ms
+            for text, live, shadow in zip(texts, live_results, candidate_results):
+                if live["type"] != shadow["type"]:
+                    stats.disagreements += 1
+                    logger.warning(strings.LOG_MODEL_SHADOW_DISAGREEMENT.format(
+                        live=live["type"], live_confidence=live["confidence"], candidate=shadow["type"],
+                        candidate_confidence=shadow["confidence"], text=text[:80].replace("\n", " ")))
+            report = stats.compared // self.report_every != (stats.compared - len(texts)) // self.report_every
+        if report:
+            logger.info(self.describe())
+
+    def load_candidate(self, path: str, promote: bool = False) -> Future:
+        self._loading_path = path
+        logger.info(strings.LOG_MODEL_CANDIDATE_LOADING.format(path=path))
+
+        def load():
+            predictor = self.loader(path)
+            with self._lock:
+                self.candidate, self.candidate_path = predictor, path
+                self.stats = ShadowStats()
+            logger.info(strings.LOG_MODEL_CANDIDATE_LOADED.format(path=path, shadow=self.shadow))
+            if promote:
+                self.promote()
+            return predictor
+
+        def done(future: Future):
+            self._loading_path = None
+            if future.exception() is not None:
+                logger.error(strings.LOG_MODEL_LOAD_FAILED.format(path=path, e=future.exception()))
+
+        future = self._loader.submit(load)
+        future.add_done_callback(done)
+        return future
+
+    def promote(self) -> bool:
+        with self._lock:
+            if self.candidate is None:
+                return False
+            stats = self.describe()
+            self.previous, self.previous_path = self.live, self.live_path
+            self.live, self.live_path = self.candidate, self.candidate_path
+            self.candidate, self.candidate_path = None, None
+            self.stats = ShadowStats()
+        logger.success(strings.LOG_MODEL_PROMOTED.format(path=self.live_path, stats=stats))
+        return True
+
+    def rollback(self) -> bool:
+        with self._lock:
+            if self.previous is None:
+                return False
+            self.live, self.previous = self.previous, self.live
+            self.live_path, self.previous_path = self.previous_path, self.live_path
+        logger.warning(strings.LOG_MODEL_ROLLED_BACK.format(path=self.live_path))
+        return True
+
+    def apply_config(self, settings: dict):
+        self.shadow = settings.get("shadow", True)
+        path = settings.get("path") or self.live_path
+        candidate_path = settings.get("candidate_path")
+        if path != self.live_path:
+            if path == self.candidate_path:
+                self.promote()
+            elif path == self.previous_path:
+                self.rollback()
+            elif path != self._loading_path:
+                self.load_candidate(path, promote=True)
+        elif candidate_path and candidate_path not in (self.candidate_path, self._loading_path):
+            self.load_candidate(candidate_path)
+
+    def describe(self) -> str:
+        return strings.LOG_MODEL_SHADOW_STATS.format(live=self.live_path, candidate=self.candidate_path,
+                                                     compared=self.stats.compared, skipped=self.stats.skipped,
+                                                     disagreements=self.stats.disagreements,
+                                                     rate=self.stats.disagreement_rate,
+                                                     delta=self.stats.mean_latency_delta_ms)
@@ -3,9 +3,13 @@ from transformers import AutoModel
 
 
 class CardClassifier(nn.Module):
-    def __init__(self, num_classes=3, model_name='DeepPavlov/rubert-base-cased'):
+    def __init__(self, num_classes=3, model_name='DeepPavlov/rubert-base-cased', num_layers=None):
         super().__init__()
-        self.bert = AutoModel.from_pretrained(model_name)
+        if num_layers is not None:
+            self.bert = AutoModel.from_pretrained(model_name, num_hidden_layers=num_layers)
+        else:
+            self.bert = AutoModel.from_pretrained(model_name)
+        self.num_layers = len(self.bert.encoder.layer)
         self.dropout = nn.Dropout(0.1)
         self.classifier = nn.Linear(self.bert.config.hidden_size, num_classes)
 
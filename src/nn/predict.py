@@ -4,39 +4,74 @@ from sklearn.preprocessing import LabelEncoder
 from typing import Union, List, Dict
 
 from .model import CardClassifier
+from .artifact import load_artifact
+from .hardware import (DEFAULT_PROFILE_PATH, available_precisions, apply_threads, host_cpu_count, inference_context,
+                       load_profile, prepare_model)
+from ..logger import logger
+from ..models import strings
 
 logging.set_verbosity_error()
 
+DEFAULT_MODEL_PATH = './data/card_classifier.pth'
+
 
 class Predictor:
-    def __init__(self, model_path='./data/card_classifier.pth'):
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, profile_path=DEFAULT_PROFILE_PATH):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.model_path = model_path
+        self.precision = "fp32"
+        self.batch_size = None
+        self.profile = load_profile(profile_path) if self.device.type == 'cpu' else None
+        if self.profile:
+            self._apply_profile(self.profile, profile_path)
+
+        state_dict, self.meta = load_artifact(model_path, self.device)
 
-        self.tokenizer = AutoTokenizer.from_pretrained('DeepPavlov/rubert-base-cased')
+        self.tokenizer = AutoTokenizer.from_pretrained(self.meta["model_name"])
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
             self.tokenizer.pad_token_id = self.tokenizer.eos_token_id
 
-        self.labels = ["duplicate_card", "new_card", "card_message"]
+        self.labels = self.meta["labels"]
         self.label_encoder = LabelEncoder().fit(self.labels)
 
-        self.model = CardClassifier(num_classes=len(self.labels)).to(self.device)
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device))
+        self.model = CardClassifier(num_classes=len(self.labels), model_name=self.meta["model_name"],
+                                    num_layers=self.meta["num_layers"]).to(self.device)
+        self.model.load_state_dict(state_dict)
         self.model.eval()
+        self.model = prepare_model(self.model, self.precision)
+
+    def _apply_profile(self, profile: dict, profile_path: str):
+        cores = host_cpu_count()
+        if profile.get("cpu_count") != cores:
+            logger.warning(strings.LOG_INFERENCE_PROFILE_CORE_MISMATCH.format(path=profile_path,
+                                                                             profiled=profile.get("cpu_count"),
+                                                                             cores=cores))
+        apply_threads(profile.get("threads"), profile.get("interop_threads"))
+        precision = profile.get("precision", "fp32")
+        self.precision = precision if precision in available_precisions() else "fp32"
+        self.batch_size = profile.get("batch_size")
+        logger.info(strings.LOG_INFERENCE_PROFILE_APPLIED.format(path=profile_path, threads=profile.get("threads"),
+                                                                 precision=self.precision,
+                                                                 batch_size=self.batch_size))
 
     def predict(self, texts: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
         is_single = isinstance(texts, str)
         if is_single:
             texts = [texts]
 
-        encodings = self.tokenizer(texts, truncation=True, padding=True, max_length=512, return_tensors='pt')
-
-        with torch.no_grad():
-            input_ids = encodings['input_ids'].to(self.device)
-            attention_mask = encodings['attention_mask'].to(self.device)
-            outputs = self.model(input_ids, attention_mask)
-            preds = torch.argmax(outputs, dim=1).cpu().numpy()
-            confidences = torch.softmax(outputs, dim=1).max(dim=1).values.cpu().numpy()
+        batch_size = self.batch_size or max(len(texts), 1)
+        preds, confidences = [], []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer(texts[start:start + batch_size], truncation=True, padding=True, max_length=512,
+                                       return_tensors='pt')
+
+            with torch.no_grad(), inference_context(self.precision):
+                input_ids = encodings['input_ids'].to(self.device)
+                attention_mask = encodings['attention_mask'].to(self.device)
+                outputs = self.model(input_ids, attention_mask).float()
+                preds.extend(torch.argmax(outputs, dim=1).cpu().numpy())
+                confidences.extend(torch.softmax(outputs, dim=1).max(dim=1).values.cpu().numpy())
 
         decoded_labels = self.label_encoder.inverse_transform(preds)
         results = []
@@ -0,0 +1,174 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoTokenizer, logging
+
+from .artifact import load_artifact, save_artifact
+from .dataset import load_texts, DEFAULT_MESSAGES_PATH
+from .model import CardClassifier
+from .predict import DEFAULT_MODEL_PATH
+from ..monitoring import current_rss_mb, peak_rss_mb
+
+logging.set_verbosity_error()
+
+MAX_LENGTH = 512
+
+
+def build_pruned_classifier(full_state_dict: dict, num_layers: int, num_classes: int,
+                            model_name: str) -> CardClassifier:
+    model = CardClassifier(num_classes=num_classes, model_name=model_name, num_layers=num_layers)
+    own_keys = model.state_dict().keys()
+    model.load_state_dict({k: v for k, v in full_state_dict.items() if k in own_keys})
+    return model
+
+
+def batched_logits(model: CardClassifier, tokenizer, texts: list[str], device, batch_size: int = 16) -> torch.Tensor:
+    model.eval()
+    outputs = []
+    with torch.inference_mode():
+        for i in range(0, len(texts), batch_size):
+            enc = tokenizer(texts[i:i + batch_size], truncation=True, padding=True, max_length=MAX_LENGTH,
+                            return_tensors='pt')
+            outputs.append(model(enc['input_ids'].to(device), enc['attention_mask'].to(device)).cpu())
+    return torch.cat(outputs)
+
+
+def distill(student: CardClassifier, tokenizer, texts: list[str], teacher_logits: torch.Tensor, device,
+            epochs: int = 3, batch_size: int = 16, lr: float = 3e-5, temperature: float = 2.0):
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr)
+    order = list(range(len(texts)))
+    rng = random.Random(0)
+    for epoch in range(epochs):
+        student.train()
+        rng.shuffle(order)
+        total_loss = 0.0
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            enc = tokenizer([texts[j] for j in idx], truncation=True, padding=True, max_length=MAX_LENGTH,
+                            return_tensors='pt')
+            logits = student(enc['input_ids'].to(device), enc['attention_mask'].to(device))
+            target = teacher_logits[idx].to(device)
+            soft_loss = F.kl_div(F.log_softmax(logits / temperature, dim=1), F.softmax(target / temperature, dim=1),
+                                 reduction='batchmean') * temperature ** 2
+            hard_loss = F.cross_entropy(logits, target.argmax(dim=1))
+            loss = soft_loss + hard_loss
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(idx)
+        print(f"  epoch {epoch + 1}/{epochs}: loss {total_loss / len(order):.4f}")
+    student.eval()
+
+
+def measure_latency_ms(model: CardClassifier, tokenizer, texts: list[str], device, samples: int = 30) -> float:
+    timings = []
+    model.eval()
+    with torch.inference_mode():
+        for text in (texts * (samples // max(len(texts), 1) + 1))[:samples]:
+            enc = tokenizer([text], truncation=True, padding=True, max_length=MAX_LENGTH, return_tensors='pt')
+            started = time.perf_counter()
+            model(enc['input_ids'].to(device), enc['attention_mask'].to(device))
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def parameter_mb(model: torch.nn.Module) -> float:
+    return sum(p.numel() * p.element_size() for p in model.parameters()) / 1024 / 1024
+
+
+def evaluate(model: CardClassifier, tokenizer, texts: list[str], reference: torch.Tensor, device) -> dict:
+    preds = batched_logits(model, tokenizer, texts, device).argmax(dim=1)
+    return {
+        "num_layers": model.num_layers,
+        "agreement": float((preds == reference).float().mean()) if len(texts) else 0.0,
+        "latency_ms": measure_latency_ms(model, tokenizer, texts, device),
+        "params_mb": parameter_mb(model),
+    }
+
+
+def _artifact_rss(path: str, texts: list[str]) -> dict:
+    device = torch.device('cpu')
+    state_dict, meta = load_artifact(path, device)
+    tokenizer = AutoTokenizer.from_pretrained(meta["model_name"])
+    model = CardClassifier(num_classes=len(meta["labels"]), model_name=meta["model_name"],
+                           num_layers=meta["num_layers"])
+    model.load_state_dict(state_dict)
+    del state_dict
+    batched_logits(model, tokenizer, texts, device)
+    return {"rss_mb": current_rss_mb(), "peak_rss_mb": peak_rss_mb()}
+
+
+def measure_rss(path: str, texts: list[str]) -> dict:
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_artifact_rss, path, texts).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.nn.prune",
+                                     description="build shallower CardClassifier variants and compare them")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--messages", default=DEFAULT_MESSAGES_PATH)
+    parser.add_argument("--layers", type=int, nargs="+", default=[2, 4, 6])
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--lr", type=float, default=3e-5)
+    parser.add_argument("--eval-fraction", type=float, default=0.2)
+    parser.add_argument("--output-dir", default="./data/models")
+    args = parser.parse_args()
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    torch.manual_seed(0)
+
+    texts = load_texts(args.messages)
+    random.Random(0).shuffle(texts)
+    split = max(1, int(len(texts) * (1 - args.eval_fraction)))
+    train_texts, eval_texts = texts[:split], texts[split:] or texts[:split]
+    print(f"{len(train_texts)} training / {len(eval_texts)} evaluation messages")
+
+    full_state, meta = load_artifact(args.model, device)
+    tokenizer = AutoTokenizer.from_pretrained(meta["model_name"])
+    num_classes = len(meta["labels"])
+
+    teacher = CardClassifier(num_classes=num_classes, model_name=meta["model_name"],
+                             num_layers=meta["num_layers"]).to(device)
+    teacher.load_state_dict(full_state)
+    teacher_train_logits = batched_logits(teacher, tokenizer, train_texts, device)
+    reference = batched_logits(teacher, tokenizer, eval_texts, device).argmax(dim=1)
+    report = [evaluate(teacher, tokenizer, eval_texts, reference, device)]
+    report[0].update(measure_rss(args.model, eval_texts))
+    del teacher
+    gc.collect()
+
+    for k in args.layers:
+        print(f"distilling {k}-layer encoder...")
+        student = build_pruned_classifier(full_state, k, num_classes, meta["model_name"]).to(device)
+        distill(student, tokenizer, train_texts, teacher_train_logits, device, epochs=args.epochs,
+                batch_size=args.batch_size, lr=args.lr)
+        result = evaluate(student, tokenizer, eval_texts, reference, device)
+        path = f"{args.output_dir}/card_classifier-k{k}.pth"
+        save_artifact(path, student, meta["labels"], model_name=meta["model_name"], num_layers=k,
+                      teacher=args.model, agreement=result["agreement"], latency_ms=result["latency_ms"])
+        result["artifact"] = path
+        result.update(measure_rss(path, eval_texts))
+        report.append(result)
+        del student
+        gc.collect()
+
+    print(f"{'layers':>6} {'agreement':>10} {'latency ms':>11} {'params MB':>10} {'RSS MB':>8} {'peak MB':>8}")
+    for r in report:
+        print(f"{r['num_layers']:>6} {r['agreement']:>10.2%} {r['latency_ms']:>11.1f} "
+              f"{r['params_mb']:>10.1f} {r['rss_mb']:>8.0f} {r['peak_rss_mb']:>8.0f}")
+    with open(f"{args.output_dir}/prune_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
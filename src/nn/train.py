@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.preprocessing import LabelEncoder
+from transformers import AutoTokenizer, logging
+
+from .artifact import load_artifact, save_artifact, DEFAULT_LABELS, MODEL_NAME
+from .dataset import DEFAULT_MESSAGES_PATH
+from .model import CardClassifier
+from .predict import DEFAULT_MODEL_PATH
+from ..models import MessageType
+from ..parser import clean_text, match_card, card_type_from_header
+
+logging.set_verbosity_error()
+
+MAX_LENGTH = 512
+DEFAULT_CACHE_DIR = "./data/cache"
+DEFAULT_OUTPUT_DIR = "./data/models"
+
+
+def label_for(text: str) -> str:
+    cleaned_text = clean_text(text)
+    if match_card(cleaned_text):
+        header_type = card_type_from_header(cleaned_text)
+        if header_type == MessageType.NEW_CARD:
+            return "new_card"
+        if header_type == MessageType.DUPLICATE_CARD:
+            return "duplicate_card"
+    return "card_message"
+
+
+def build_dataset(path: str) -> tuple[list[str], list[str]]:
+    texts, labels, seen = [], [], set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("text")
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            texts.append(text)
+            labels.append(record.get("label") or label_for(text))
+    return texts, labels
+
+
+def dataset_key(texts: list[str], base_path: str | None, model_name: str, num_layers: int | None) -> str:
+    digest = hashlib.sha1()
+    digest.update(f"{model_name}|{num_layers}|".encode())
+    if base_path:
+        stat = os.stat(base_path)
+        digest.update(f"{os.path.abspath(base_path)}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def cached_embeddings(model: CardClassifier, tokenizer, texts: list[str], cache_path: str, device,
+                      batch_size: int = 32) -> np.ndarray:
+    if os.path.exists(cache_path):
+        print(f"using cached embeddings {cache_path}")
+        return np.load(cache_path, mmap_mode="r")
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp.npy"
+    features = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                         shape=(len(texts), model.bert.config.hidden_size))
+    model.eval()
+    started = time.perf_counter()
+    with torch.inference_mode():
+        for i in range(0, len(texts), batch_size):
+            enc = tokenizer(texts[i:i + batch_size], truncation=True, padding=True, max_length=MAX_LENGTH,
+                            return_tensors='pt')
+            pooled = model.bert(input_ids=enc['input_ids'].to(device),
+                                attention_mask=enc['attention_mask'].to(device)).pooler_output
+            features[i:i + len(pooled)] = pooled.cpu().numpy()
+    features.flush()
+    del features
+    os.replace(tmp_path, cache_path)
+    print(f"embedded {len(texts)} messages in {time.perf_counter() - started:.1f}s -> {cache_path}")
+    return np.load(cache_path, mmap_mode="r")
+
+
+def split_indices(labels: list[str], eval_fraction: float, seed: int = 0) -> tuple[list[int], list[int]]:
+    rng = random.Random(seed)
+    by_label: dict[str, list[int]] = {}
+    for i, label in enumerate(labels):
+        by_label.setdefault(label, []).append(i)
+    train, evaluation = [], []
+    for indices in by_label.values():
+        rng.shuffle(indices)
+        n_eval = int(len(indices) * eval_fraction) if len(indices) > 1 else 0
+        evaluation.extend(indices[:n_eval])
+        train.extend(indices[n_eval:])
+    return train, evaluation or train
+
+
+def train_head(head: torch.nn.Linear, features: torch.Tensor, targets: torch.Tensor, epochs: int = 300,
+               lr: float = 1e-2, weight_decay: float = 1e-4):
+    optimizer = torch.optim.AdamW(head.parameters(), lr=lr, weight_decay=weight_decay)
+    head.train()
+    for _ in range(epochs):
+        loss = F.cross_entropy(head(features), targets)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    head.eval()
+    return loss.item()
+
+
+def fine_tune(model: CardClassifier, tokenizer, texts: list[str], targets: torch.Tensor, device, epochs: int,
+              batch_size: int = 16, lr: float = 2e-5):
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    order = list(range(len(texts)))
+    rng = random.Random(0)
+    for epoch in range(epochs):
+        model.train()
+        rng.shuffle(order)
+        total_loss = 0.0
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            enc = tokenizer([texts[j] for j in idx], truncation=True, padding=True, max_length=MAX_LENGTH,
+                            return_tensors='pt')
+            logits = model(enc['input_ids'].to(device), enc['attention_mask'].to(device))
+            loss = F.cross_entropy(logits, targets[idx].to(device))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(idx)
+        print(f"  epoch {epoch + 1}/{epochs}: loss {total_loss / len(order):.4f}")
+    model.eval()
+
+
+def evaluate_predictions(preds: np.ndarray, targets: np.ndarray, encoder: LabelEncoder) -> dict:
+    label_ids = list(range(len(encoder.classes_)))
+    return {
+        "accuracy": float((preds == targets).mean()) if len(targets) else 0.0,
+        "report": classification_report(targets, preds, labels=label_ids, target_names=list(encoder.classes_),
+                                        output_dict=True, zero_division=0),
+        "confusion_matrix": confusion_matrix(targets, preds, labels=label_ids).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.nn.train",
+                                     description="train and evaluate the card message classifier")
+    parser.add_argument("--messages", default=DEFAULT_MESSAGES_PATH)
+    parser.add_argument("--base", default=DEFAULT_MODEL_PATH,
+                        help="artifact whose encoder is reused; empty string starts from pretrained rubert")
+    parser.add_argument("--num-layers", type=int, default=None)
+    parser.add_argument("--full-finetune", action="store_true", help="fine-tune the whole model, not only the head")
+    parser.add_argument("--epochs", type=int, default=3, help="epochs for --full-finetune")
+    parser.add_argument("--head-epochs", type=int, default=300)
+    parser.add_argument("--eval-fraction", type=float, default=0.2)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args()
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    torch.manual_seed(0)
+
+    texts, labels = build_dataset(args.messages)
+    encoder = LabelEncoder().fit(sorted(set(labels) | set(DEFAULT_LABELS)))
+    targets = torch.tensor(encoder.transform(labels), dtype=torch.long)
+    counts = {label: labels.count(label) for label in encoder.classes_}
+    print(f"dataset: {len(texts)} messages {counts}")
+
+    if args.base:
+        state_dict, meta = load_artifact(args.base, device)
+        model_name, num_layers = meta["model_name"], args.num_layers or meta["num_layers"]
+    else:
+        state_dict, model_name, num_layers = None, MODEL_NAME, args.num_layers
+
+    model = CardClassifier(num_classes=len(encoder.classes_), model_name=model_name, num_layers=num_layers).to(device)
+    if state_dict is not None:
+        own_keys = model.state_dict().keys()
+        state_dict = {k: v for k, v in state_dict.items() if k in own_keys and not k.startswith("classifier.")}
+        model.load_state_dict(state_dict, strict=False)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    train_idx, eval_idx = split_indices(labels, args.eval_fraction)
+    key = dataset_key(texts, args.base or None, model_name, model.num_layers)
+    started = time.perf_counter()
+
+    if args.full_finetune:
+        mode = "full_finetune"
+        fine_tune(model, tokenizer, [texts[i] for i in train_idx], targets[train_idx], device, args.epochs)
+        with torch.inference_mode():
+            preds = []
+            for i in range(0, len(eval_idx), 32):
+                batch = [texts[j] for j in eval_idx[i:i + 32]]
+                enc = tokenizer(batch, truncation=True, padding=True, max_length=MAX_LENGTH, return_tensors='pt')
+                preds.append(model(enc['input_ids'].to(device), enc['attention_mask'].to(device)).argmax(dim=1).cpu())
+            eval_preds = torch.cat(preds).numpy()
+    else:
+        mode = "head"
+        cache_path = os.path.join(args.cache_dir, f"embeddings-{key}.npy")
+        embeddings = cached_embeddings(model, tokenizer, texts, cache_path, device)
+        train_features = torch.from_numpy(np.ascontiguousarray(embeddings[train_idx]))
+        eval_features = torch.from_numpy(np.ascontiguousarray(embeddings[eval_idx]))
+
+        head = model.classifier.cpu()
+        head_started = time.perf_counter()
+        loss = train_head(head, train_features, targets[train_idx], epochs=args.head_epochs)
+        print(f"head trained in {time.perf_counter() - head_started:.2f}s (loss {loss:.4f})")
+        with torch.inference_mode():
+            eval_preds = head(eval_features).argmax(dim=1).numpy()
+        model.classifier.to(device)
+
+    metrics = evaluate_predictions(eval_preds, targets[eval_idx].numpy(), encoder)
+    metrics.update({"mode": mode, "dataset_key": key, "train_size": len(train_idx), "eval_size": len(eval_idx),
+                    "label_counts": counts, "train_seconds": time.perf_counter() - started})
+
+    version = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.output_dir, f"card_classifier-v{version}.pth")
+    save_artifact(path, model, list(encoder.classes_), model_name=model_name, num_layers=model.num_layers,
+                  version=version, base=args.base, accuracy=metrics["accuracy"], mode=mode, dataset_key=key)
+    with open(os.path.join(args.output_dir, f"card_classifier-v{version}.metrics.json"), "w",
+              encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2, ensure_ascii=False)
+
+    print(f"accuracy {metrics['accuracy']:.2%} on {len(eval_idx)} messages")
+    print(f"artifact written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,243 @@
 import re
-from .models import ParsedMessage, MessageType, strings
-from .utils import clean_and_convert_to_int, remove_formatting
-from .nn.predict import Predictor
+import threading
+from dataclasses import dataclass
+from .models import (ParsedMessage, MessageType, BoosterInfo, CardRecord, ProfileRecord, CooldownRecord, Rarity,
+                     strings)
+from .utils import CleanText, clean_and_convert_to_int, normalize_text, remove_formatting
+from .catalog import CardCatalog
+from .config_manager import get_config
+from .nn.batcher import InferenceBatcher
 
-predictor = Predictor()
+_predictor = None
+_predictor_lock = threading.Lock()
 
-def parse_message(text: str) -> ParsedMessage:
-    cleaned_text = remove_formatting(text)
-    cleaned_text = cleaned_text.replace('\u200b', '')
+card_detail_pattern = re.compile(
+    r"«(.+?)»[^\n]*\n\n"
+    rf".*?{strings.KEYWORD_RARITY_TEXT} • (.+?)\n"
+    rf".*?{strings.KEYWORD_POINTS_TEXT} • [+-]?[\d,]+ \[(.+?)]\n"
+    rf".*?{strings.KEYWORD_COINS_TEXT} • [+-]?[\d,]+ \[(.+?)]",
+    re.DOTALL
+)
+
+profile_pattern = re.compile(
+    rf"{strings.KEYWORD_PROFILE_TITLE}.+?\n\n"
+    rf".*?{strings.KEYWORD_COINS_TEXT} • ([\d,]+)", re.DOTALL
+)
+
+balance_pattern = re.compile(rf"{strings.KEYWORD_COINS_TEXT} • ([\d,]+)")
+
+booster_line_pattern = re.compile(
+    rf"^(?P<name>[^\n•]+?) • (?P<value>[\d,]+) ?(?P<unit>{strings.KEYWORD_PIECES}\.?|{strings.COINS_EMOJI})"
+    rf"(?P<rest>[^\n]*)$", re.MULTILINE
+)
+
+booster_button_pattern = re.compile(
+    rf"^(?P<name>.+?) (?:\((?P<count>\d+)\)|• (?P<price>[\d,]+) ?{strings.COINS_EMOJI})$"
+)
+
+cooldown_pattern = re.compile(
+    rf"(?:{'|'.join(strings.KEYWORD_COOLDOWN_VARIANTS)}) "
+    rf"(?:(\d+)ч\. )?"
+    rf"(?:(\d+)мин\. )?"
+    rf"(\d+)сек\."
+)
+
+
+@dataclass
+class ParseStats:
+    card_messages: int = 0
+    model_calls: int = 0
+    resolved_by_header: int = 0
+    resolved_by_catalog: int = 0
+    catalog_mismatches: int = 0
+
+    @property
+    def model_call_reduction(self) -> float:
+        if not self.card_messages:
+            return 0.0
+        return 1 - self.model_calls / self.card_messages
+
+
+parse_stats = ParseStats()
+
+
+def get_predictor():
+    global _predictor
+    if _predictor is not None:
+        return _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            from .nn.predict import Predictor, DEFAULT_MODEL_PATH
+            from .nn.hardware import DEFAULT_PROFILE_PATH
+            from .nn.hotswap import HotSwapPredictor
+            model_settings = get_config().get("model", {})
+            profile_path = model_settings.get("profile_path", DEFAULT_PROFILE_PATH)
+            predictor = HotSwapPredictor(lambda path: Predictor(path, profile_path),
+                                         model_settings.get("path", DEFAULT_MODEL_PATH),
+                                         shadow=model_settings.get("shadow", True))
+            predictor.apply_config(model_settings)
+            _predictor = predictor
+    return _predictor
 
-    prediction = predictor.predict(cleaned_text)
-    predicted_message_type = prediction.get('message_type')
 
-    if predicted_message_type in ('NEW_CARD', 'DUPLICATE_CARD'):
-        card_detail_pattern = re.compile(
-            r"«(.+?)»[^\n]*\n\n"
-            rf".*?{strings.KEYWORD_RARITY_TEXT} • (.+?)\n"
-            rf".*?{strings.KEYWORD_POINTS_TEXT} • [+-]?[\d,]+ \[(.+?)]\n"
-            rf".*?{strings.KEYWORD_COINS_TEXT} • [+-]?[\d,]+ \[(.+?)]" ,
-            re.DOTALL
-        )
-        card_match = card_detail_pattern.search(cleaned_text)
-        
-        if card_match:
-            card_type = MessageType.NEW_CARD if predicted_message_type == 'NEW_CARD' else MessageType.DUPLICATE_CARD
-            return ParsedMessage(type=card_type, details={
-                "name": card_match.group(1).strip(),
-                "rarity": card_match.group(2).strip(),
-                "total_points": clean_and_convert_to_int(card_match.group(3)),
-                "total_coins": clean_and_convert_to_int(card_match.group(4)),
-                "booster_used": strings.BOOSTER_LUCK if strings.KEYWORD_BOOSTER_USED_TEXT in cleaned_text else None
-            })
-
-    profile_pattern = re.compile(
-        rf"{strings.KEYWORD_PROFILE_TITLE}.+?\n\n"
-        rf".*?{strings.KEYWORD_COINS_TEXT} • ([\d,]+)", re.DOTALL
+def reload_predictor(model_settings: dict) -> bool:
+    if _predictor is None:
+        return False
+    _predictor.apply_config(model_settings)
+    return True
+
+
+def match_card(cleaned_text: str) -> CardRecord | None:
+    card_match = card_detail_pattern.search(cleaned_text)
+    if not card_match:
+        return None
+    return CardRecord(
+        name=card_match.group(1).strip(),
+        rarity=Rarity.from_label(card_match.group(2)),
+        total_points=clean_and_convert_to_int(card_match.group(3)),
+        total_coins=clean_and_convert_to_int(card_match.group(4)),
+        luck_boosted=strings.KEYWORD_BOOSTER_USED_TEXT in cleaned_text,
+        rarity_label=card_match.group(2).strip()
     )
+
+
+def card_type_from_header(cleaned_text: str) -> MessageType | None:
+    header = cleaned_text.split("\n", 1)[0]
+    if header.startswith(strings.CARD_NEW_EMOJI) or strings.KEYWORD_CARD_NEW_HEADER in header:
+        return MessageType.NEW_CARD
+    if header.startswith(strings.CARD_DUPLICATE_EMOJI) or strings.KEYWORD_CARD_DUPLICATE_HEADER in header:
+        return MessageType.DUPLICATE_CARD
+    return None
+
+
+def _type_from_prediction(prediction: dict) -> MessageType | None:
+    predicted_message_type = prediction.get('message_type')
+    if predicted_message_type == 'NEW_CARD':
+        return MessageType.NEW_CARD
+    if predicted_message_type == 'DUPLICATE_CARD':
+        return MessageType.DUPLICATE_CARD
+    return None
+
+
+def _predict_card_type(cleaned_text: str) -> MessageType | None:
+    parse_stats.model_calls += 1
+    return _type_from_prediction(get_predictor().predict(cleaned_text))
+
+
+def _resolve_without_model(cleaned_text: str, name: str,
+                           catalog: CardCatalog | None) -> tuple[MessageType | None, MessageType | None]:
+    parse_stats.card_messages += 1
+    header_type = card_type_from_header(cleaned_text)
+    if header_type is None:
+        return None, None
+
+    if catalog is None:
+        parse_stats.resolved_by_header += 1
+        return header_type, None
+
+    catalog_type = MessageType.DUPLICATE_CARD if name in catalog else MessageType.NEW_CARD
+    if catalog_type == header_type:
+        parse_stats.resolved_by_catalog += 1
+        return header_type, catalog_type
+    return None, catalog_type
+
+
+def _check_prediction(predicted_type: MessageType | None, catalog_type: MessageType | None) -> MessageType | None:
+    if catalog_type is not None and predicted_type != catalog_type:
+        parse_stats.catalog_mismatches += 1
+    return predicted_type
+
+
+def resolve_card_type(cleaned_text: str, name: str, catalog: CardCatalog | None = None) -> MessageType | None:
+    card_type, catalog_type = _resolve_without_model(cleaned_text, name, catalog)
+    if card_type is not None:
+        return card_type
+    return _check_prediction(_predict_card_type(cleaned_text), catalog_type)
+
+
+async def resolve_card_type_async(cleaned_text: str, name: str, catalog: CardCatalog | None,
+                                  batcher: InferenceBatcher) -> MessageType | None:
+    card_type, catalog_type = _resolve_without_model(cleaned_text, name, catalog)
+    if card_type is not None:
+        return card_type
+    parse_stats.model_calls += 1
+    return _check_prediction(_type_from_prediction(await batcher.predict(cleaned_text)), catalog_type)
+
+
+def clean_text(text: str) -> CleanText:
+    if isinstance(text, CleanText):
+        return text
+    return normalize_text(remove_formatting(text))
+
+
+def parse_card(text: str) -> CardRecord | None:
+    return match_card(clean_text(text))
+
+
+def parse_balance(text: str | None) -> int | None:
+    if not text:
+        return None
+    balance_match = balance_pattern.search(clean_text(text))
+    return clean_and_convert_to_int(balance_match.group(1)) if balance_match else None
+
+
+def parse_booster_screen(text: str | None, buttons: list[str] | None = None) -> dict[str, BoosterInfo]:
+    boosters = {}
+    for line_match in booster_line_pattern.finditer(clean_text(text or "")):
+        name = line_match.group("name").strip()
+        info = boosters.setdefault(name, BoosterInfo(name))
+        value = clean_and_convert_to_int(line_match.group("value"))
+        if line_match.group("unit") == strings.COINS_EMOJI:
+            info.price = value
+        else:
+            info.count = value
+        if strings.KEYWORD_BOOSTER_ACTIVE in line_match.group("rest"):
+            info.active = True
+
+    for label in buttons or []:
+        button_match = booster_button_pattern.match(label.strip())
+        if not button_match:
+            continue
+        name = button_match.group("name").strip()
+        info = boosters.setdefault(name, BoosterInfo(name))
+        if button_match.group("count") is not None and info.count is None:
+            info.count = int(button_match.group("count"))
+        if button_match.group("price") is not None and info.price is None:
+            info.price = clean_and_convert_to_int(button_match.group("price"))
+    return boosters
+
+
+def parse_message(text: str, catalog: CardCatalog | None = None) -> ParsedMessage:
+    cleaned_text = clean_text(text)
+
+    card = match_card(cleaned_text)
+    if card:
+        card_type = resolve_card_type(cleaned_text, card.name, catalog)
+        if card_type is not None:
+            return ParsedMessage(type=card_type, record=card)
+    return _parse_non_card(cleaned_text)
+
+
+async def parse_message_async(text: str, catalog: CardCatalog | None = None,
+                              batcher: InferenceBatcher | None = None) -> ParsedMessage:
+    if batcher is None:
+        return parse_message(text, catalog)
+    cleaned_text = clean_text(text)
+
+    card = match_card(cleaned_text)
+    if card:
+        card_type = await resolve_card_type_async(cleaned_text, card.name, catalog, batcher)
+        if card_type is not None:
+            return ParsedMessage(type=card_type, record=card)
+    return _parse_non_card(cleaned_text)
+
+
+def _parse_non_card(cleaned_text: str) -> ParsedMessage:
     profile_match = profile_pattern.search(cleaned_text)
     if profile_match:
-        return ParsedMessage(type=MessageType.PROFILE_INFO, details={
-            "total_coins": clean_and_convert_to_int(profile_match.group(1))
-        })
-
-    cooldown_pattern = re.compile(
-        rf"(?:{'|'.join(strings.KEYWORD_COOLDOWN_VARIANTS)}) "
-        rf"(?:(\d+)ч\. )?"
-        rf"(?:(\d+)мин\. )?"
-        rf"(\d+)сек\."
-    )
+        return ParsedMessage(type=MessageType.PROFILE_INFO,
+                             record=ProfileRecord(total_coins=clean_and_convert_to_int(profile_match.group(1))))
+
     cooldown_match = cooldown_pattern.search(cleaned_text)
     if cooldown_match:
         hours_str, minutes_str, seconds_str = cooldown_match.groups()
@@ -55,7 +245,7 @@ def parse_message(text: str) -> ParsedMessage:
         minutes = int(minutes_str) if minutes_str else 0
         seconds = int(seconds_str) if seconds_str else 0
         total_seconds = hours * 3600 + minutes * 60 + seconds
-        return ParsedMessage(type=MessageType.COOLDOWN, details={"cooldown": total_seconds})
+        return ParsedMessage(type=MessageType.COOLDOWN, record=CooldownRecord(seconds=total_seconds))
 
     if strings.KEYWORD_COOLDOWN_REDUCED in cleaned_text:
         return ParsedMessage(type=MessageType.COOLDOWN_REDUCED)
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import time
+
+from telethon import TelegramClient, events
+from telethon.tl.custom.message import Message
+
+from .logger import logger
+from .models import strings
+
+DEFAULT_TRAFFIC_PATH = "./data/traffic/traffic-{date}.jsonl.gz"
+
+
+def _button_labels(message: Message) -> list[list[str]] | None:
+    if not message.buttons:
+        return None
+    return [[button.text for button in row] for row in message.buttons]
+
+
+class TrafficRecorder:
+    def __init__(self, path: str = DEFAULT_TRAFFIC_PATH, flush_interval: float = 1.0):
+        self.path = path.format(date=time.strftime("%Y%m%d"))
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._file = None
+        self._last_flush = 0.0
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+        logger.info(strings.LOG_RECORDER_STARTED.format(path=self.path))
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def attach(self, app: TelegramClient, target_bot_id):
+        if self._file is None:
+            self.open()
+        app.add_event_handler(self._on_new_message, events.NewMessage(chats=target_bot_id))
+        app.add_event_handler(self._on_message_edited, events.MessageEdited(chats=target_bot_id))
+
+    def _write(self, record: dict):
+        if self._file is None:
+            return
+        record["t"] = time.time()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
+        if record["t"] - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = record["t"]
+
+    def _message_record(self, kind: str, message: Message) -> dict:
+        return {
+            "kind": kind,
+            "id": message.id,
+            "date": message.date.timestamp() if message.date else None,
+            "out": bool(message.out),
+            "text": message.text,
+            "raw_text": message.raw_text,
+            "buttons": _button_labels(message),
+        }
+
+    async def _on_new_message(self, event):
+        self._write(self._message_record("new", event.message))
+
+    async def _on_message_edited(self, event):
+        self._write(self._message_record("edit", event.message))
+
+    def record_send(self, text: str):
+        self._write({"kind": "send", "text": text})
+
+    def record_click(self, message: Message, button_text: str):
+        self._write({"kind": "click", "id": message.id, "button": button_text})
+
+
+def read_log(path: str) -> list[dict]:
+    records = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        logger.warning(strings.LOG_RECORDER_TRUNCATED_LOG.format(path=path, count=len(records), e=e))
+    return records
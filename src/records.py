@@ -0,0 +1,158 @@
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+from .models import ParsedMessage, MessageType, CardRecord, ProfileRecord, CooldownRecord, Rarity
+
+MAGIC = b"KRA4"
+COLUMNS = (("kinds", "B"), ("message_ids", "q"), ("dates", "d"), ("name_ids", "i"), ("label_ids", "i"),
+           ("rarities", "B"), ("points", "q"), ("coins", "q"), ("seconds", "i"), ("flags", "B"))
+SWAP_BYTES = sys.byteorder != "little"
+KINDS = list(MessageType)
+KIND_IDS = {kind: i for i, kind in enumerate(KINDS)}
+FLAG_RECORD = 1
+FLAG_LUCK_BOOSTED = 2
+FLAG_CARD = 4
+
+
+class RecordArray:
+    def __init__(self):
+        for column, typecode in COLUMNS:
+            setattr(self, column, array(typecode))
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def append(self, parsed: ParsedMessage, message_id: int = 0, date: float = 0.0):
+        record = parsed.record
+        name_id, label_id, rarity, points, coins, seconds, flags = -1, -1, 0, 0, 0, 0, 0
+        if isinstance(record, CardRecord):
+            name_id, rarity, points, coins = self._name_id(record.name), record.rarity, record.total_points, record.total_coins
+            label_id = self._name_id(record.rarity_label)
+            flags = FLAG_RECORD | FLAG_CARD | (FLAG_LUCK_BOOSTED if record.luck_boosted else 0)
+        elif isinstance(record, ProfileRecord):
+            coins, flags = record.total_coins, FLAG_RECORD
+        elif isinstance(record, CooldownRecord):
+            seconds, flags = record.seconds, FLAG_RECORD
+
+        self.kinds.append(KIND_IDS[parsed.type])
+        self.message_ids.append(message_id)
+        self.dates.append(date)
+        self.name_ids.append(name_id)
+        self.label_ids.append(label_id)
+        self.rarities.append(rarity)
+        self.points.append(points)
+        self.coins.append(coins)
+        self.seconds.append(seconds)
+        self.flags.append(flags)
+
+    def extend(self, items: Iterable[tuple[int, float, ParsedMessage]]):
+        for message_id, date, parsed in items:
+            self.append(parsed, message_id, date)
+
+    def __getitem__(self, i: int) -> ParsedMessage:
+        kind = KINDS[self.kinds[i]]
+        flags = self.flags[i]
+        if not flags & FLAG_RECORD:
+            return ParsedMessage(type=kind)
+        if self.name_ids[i] >= 0:
+            record = CardRecord(name=self.names[self.name_ids[i]], rarity=Rarity(self.rarities[i]),
+                                total_points=self.points[i], total_coins=self.coins[i],
+                                luck_boosted=bool(flags & FLAG_LUCK_BOOSTED),
+                                rarity_label=self.names[self.label_ids[i]])
+        elif kind == MessageType.PROFILE_INFO:
+            record = ProfileRecord(total_coins=self.coins[i])
+        else:
+            record = CooldownRecord(seconds=self.seconds[i])
+        return ParsedMessage(type=kind, record=record)
+
+    def __iter__(self) -> Iterator[ParsedMessage]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def indices_of(self, *types: MessageType) -> list[int]:
+        wanted = {KIND_IDS[t] for t in types}
+        return [i for i, kind in enumerate(self.kinds) if kind in wanted]
+
+    def iter_cards(self) -> Iterator[tuple[str, Rarity, float]]:
+        for i, name_id in enumerate(self.name_ids):
+            if name_id >= 0:
+                yield self.names[name_id], Rarity(self.rarities[i]), self.dates[i]
+
+    def count_by_rarity(self) -> dict[Rarity, int]:
+        rarities, flags = self.rarities.tobytes(), self.flags.tobytes()
+        counts = {rarity: rarities.count(rarity) for rarity in Rarity if rarity is not Rarity.UNKNOWN}
+        cards = sum(flags.count(FLAG_RECORD | FLAG_CARD | boosted) for boosted in (0, FLAG_LUCK_BOOSTED))
+        counts[Rarity.UNKNOWN] = cards - sum(counts.values())
+        return {rarity: n for rarity, n in counts.items() if n}
+
+    def total_coins_earned(self) -> int:
+        coins = [c for c, name_id in zip(self.coins, self.name_ids) if name_id >= 0]
+        return coins[-1] - coins[0] if len(coins) > 1 else 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, column).itemsize * len(getattr(self, column)) for column, _ in COLUMNS)
+
+    def save(self, path: str):
+        encoded = [name.encode("utf-8") for name in self.names]
+        lengths = array("I", map(len, encoded))
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<QQ", len(self), len(encoded)))
+            for values in [lengths] + [getattr(self, column) for column, _ in COLUMNS]:
+                if SWAP_BYTES:
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(f)
+            f.write(b"".join(encoded))
+
+    @classmethod
+    def load(cls, path: str) -> "RecordArray":
+        records = cls()
+        with open(path, "rb") as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{path} is not a record array file")
+            count, name_count = struct.unpack("<QQ", f.read(16))
+            lengths = array("I")
+            for values, size in [(lengths, name_count)] + [(getattr(records, column), count) for column, _ in COLUMNS]:
+                values.fromfile(f, size)
+                if SWAP_BYTES:
+                    values.byteswap()
+            blob = f.read()
+        offset = 0
+        for length in lengths:
+            records.names.append(blob[offset:offset + length].decode("utf-8"))
+            offset += length
+        records._name_ids = {name: i for i, name in enumerate(records.names)}
+        return records
+
+
+def from_parsed(items: Iterable[tuple[int, float, ParsedMessage]]) -> RecordArray:
+    records = RecordArray()
+    records.extend(items)
+    return records
+
+
+def to_parsed(records: RecordArray) -> list[ParsedMessage]:
+    return list(records)
+
+
+def records_from_messages(messages: Iterable[tuple[int, float, str]], catalog=None) -> RecordArray:
+    from .parser import parse_message
+
+    records = RecordArray()
+    for message_id, date, text in messages:
+        parsed = parse_message(text, catalog)
+        if parsed is not None:
+            records.append(parsed, message_id, date)
+    return records
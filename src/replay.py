@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import copy
+import difflib
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from .config_manager import get_config
+from .logger import logger
+from .models import strings, MessageType
+from .parser import parse_card, card_type_from_header, clean_text
+from .recorder import read_log
+from .sim.fake_client import FakeClient
+from .utils import set_delay_scale
+
+
+@dataclass
+class ReplayResult:
+    incoming: int = 0
+    expected_outgoing: list[tuple[str, str]] = field(default_factory=list)
+    actual_outgoing: list[tuple[str, str]] = field(default_factory=list)
+    first_divergence: int | None = None
+    wait_timeouts: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def matched(self) -> bool:
+        return self.first_divergence is None
+
+
+def replay_config(config: dict, target_bot_id: int, mode: str | None = None) -> dict:
+    config = copy.deepcopy(config)
+    config["target_bot_id"] = target_bot_id
+    if mode:
+        config["mode"] = mode
+    config["catalog"] = {**config.get("catalog", {}), "path": ""}
+    config["catchup"] = {**config.get("catchup", {}), "path": ""}
+    config["recorder"] = {"enabled": False}
+    config["diagnostics"] = {"loop_lag_monitor": False, "profile_signal": False}
+    config["outbound"] = {**config.get("outbound", {}), "rate_per_minute": 0}
+    return config
+
+
+def previously_owned_cards(records: list[dict]) -> list[tuple[str, str]]:
+    seen, owned = set(), []
+    for record in records:
+        if record["kind"] != "new" or record.get("out") or not record.get("text"):
+            continue
+        card = parse_card(record["text"])
+        if not card or card.name in seen:
+            continue
+        seen.add(card.name)
+        if card_type_from_header(clean_text(record["text"])) == MessageType.DUPLICATE_CARD:
+            owned.append((card.name, card.rarity_label))
+    return owned
+
+
+class ReplayDriver:
+    def __init__(self, records: list[dict], config: dict | None = None, realtime: bool = False, speed: float = 1.0,
+                 step_timeout: float = 2.0, mode: str | None = None, seed: int = 0):
+        self.records = records
+        self.base_config = config if config is not None else get_config()
+        self.realtime = realtime
+        self.speed = speed
+        self.step_timeout = step_timeout
+        self.mode = mode
+        self.seed = seed
+
+    async def _wait_for_outgoing(self, client: FakeClient, count: int, expected, result: ReplayResult):
+        deadline = time.monotonic() + self.step_timeout
+        while len(client.outgoing) < count:
+            if time.monotonic() >= deadline:
+                result.wait_timeouts += 1
+                logger.debug(strings.LOG_REPLAY_WAIT_TIMEOUT.format(index=count, expected=expected))
+                return
+            await asyncio.sleep(0.001)
+
+    async def run(self) -> ReplayResult:
+        from bot import KomaruBot
+
+        random.seed(self.seed)
+        set_delay_scale(0)
+        result = ReplayResult()
+        max_id = max((r.get("id") or 0 for r in self.records), default=0)
+        client = FakeClient(first_message_id=max_id + 1_000_000)
+        bot = KomaruBot(config=replay_config(self.base_config, client.bot.id, self.mode), app=client)
+        for name, rarity in previously_owned_cards(self.records):
+            bot.catalog.record(name, rarity, save=False)
+
+        started = time.monotonic()
+        bot_task = asyncio.create_task(bot.start())
+        previous_t = None
+        for record in self.records:
+            kind = record["kind"]
+            if kind == "send":
+                result.expected_outgoing.append(("send", record["text"]))
+                continue
+            if kind == "click":
+                result.expected_outgoing.append(("click", record["button"]))
+                continue
+            if record.get("out"):
+                continue
+
+            await self._wait_for_outgoing(client, len(result.expected_outgoing),
+                                          result.expected_outgoing[-1:] or None, result)
+            if self.realtime and previous_t is not None:
+                await asyncio.sleep(max(0.0, record["t"] - previous_t) / self.speed)
+            previous_t = record["t"]
+
+            date = datetime.fromtimestamp(record["date"], timezone.utc) if record.get("date") else None
+            message = client.make_message(record.get("raw_text") or record["text"], record.get("buttons"),
+                                          message_id=record["id"], date=date, formatted_text=record.get("text"))
+            if kind == "new":
+                client.push_new(message)
+            else:
+                client.push_edit(message)
+            result.incoming += 1
+            await asyncio.sleep(0)
+
+        await self._wait_for_outgoing(client, len(result.expected_outgoing), None, result)
+        bot_task.cancel()
+        await asyncio.gather(bot_task, return_exceptions=True)
+        await bot.stop()
+
+        result.elapsed = time.monotonic() - started
+        result.actual_outgoing = list(client.outgoing)
+        matcher = difflib.SequenceMatcher(a=result.expected_outgoing, b=result.actual_outgoing, autojunk=False)
+        for tag, i1, _, j1, _ in matcher.get_opcodes():
+            if tag != "equal":
+                result.first_divergence = i1
+                expected = result.expected_outgoing[i1] if i1 < len(result.expected_outgoing) else None
+                actual = result.actual_outgoing[j1] if j1 < len(result.actual_outgoing) else None
+                logger.warning(strings.LOG_REPLAY_DIVERGED.format(index=i1, expected=expected, actual=actual))
+                break
+        return result
+
+
+async def replay_many(records: list[dict], bots: int, seed: int = 0, **kwargs) -> list[ReplayResult]:
+    return await asyncio.gather(*(ReplayDriver(records, seed=seed + i, **kwargs).run() for i in range(bots)))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.replay", description="replay recorded bot traffic")
+    parser.add_argument("log", help="traffic log written by the recorder (.jsonl.gz)")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded gaps between incoming messages")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression factor for --realtime")
+    parser.add_argument("--step-timeout", type=float, default=2.0,
+                        help="seconds to wait for the bot's next outgoing action before feeding the next message")
+    parser.add_argument("--mode", choices=["automatic", "semi-automatic"])
+    parser.add_argument("--bots", type=int, default=1, help="replay the log through this many bots at once")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    records = read_log(args.log)
+    results = asyncio.run(replay_many(records, args.bots, realtime=args.realtime, speed=args.speed,
+                                      step_timeout=args.step_timeout, mode=args.mode, seed=args.seed))
+    for i, r in enumerate(results):
+        status = "match" if r.matched else f"diverged at outgoing #{r.first_divergence}"
+        print(f"bot {i}: {r.incoming} incoming, {len(r.actual_outgoing)}/{len(r.expected_outgoing)} outgoing, "
+              f"{r.wait_timeouts} wait timeouts, {r.elapsed:.2f}s - {status}")
+    raise SystemExit(0 if all(r.matched for r in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.tl.custom.message import Message
+
+from .logger import logger
+from .models import strings
+
+
+@dataclass
+class SendStats:
+    sends: int = 0
+    clicks: int = 0
+    merged: int = 0
+    flood_waits: int = 0
+    flood_wait_seconds: float = 0.0
+    throttled_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    recent: deque = field(default_factory=deque)
+
+    @property
+    def total(self) -> int:
+        return self.sends + self.clicks
+
+    @property
+    def rate_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.total / elapsed * 60 if elapsed > 0 else 0.0
+
+    @property
+    def last_minute(self) -> int:
+        cutoff = time.monotonic() - 60
+        while self.recent and self.recent[0] < cutoff:
+            self.recent.popleft()
+        return len(self.recent)
+
+
+class OutboundScheduler:
+    def __init__(self, app: TelegramClient, config: dict):
+        self.app = app
+        settings = config.get("outbound", {})
+        self.rate = settings.get("rate_per_minute", 20) / 60
+        self.burst = settings.get("burst", 3)
+        self.max_flood_wait = settings.get("max_flood_wait_seconds", 3600)
+        self.merge_commands = set(settings.get("merge_commands", [strings.CMD_KOMARU]))
+
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.stats = SendStats()
+        self.recorder = None
+
+        self._lock = asyncio.Lock()
+        self._pending: dict[tuple, asyncio.Future] = {}
+
+    @property
+    def is_throttling(self) -> bool:
+        return self.waiting > 0
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def _acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+                self.stats.throttled_seconds += wait
+                await asyncio.sleep(wait)
+
+    async def _run(self, request, record=None, before_send=None):
+        while True:
+            self.waiting += 1
+            try:
+                await self._acquire()
+            finally:
+                self.waiting -= 1
+
+            if before_send:
+                before_send()
+            try:
+                result = await request()
+                self.stats.recent.append(time.monotonic())
+                if record and self.recorder:
+                    record()
+                return result
+            except FloodWaitError as e:
+                self.stats.flood_waits += 1
+                if e.seconds > self.max_flood_wait:
+                    logger.error(strings.LOG_OUTBOUND_FLOOD_WAIT_TOO_LONG.format(seconds=e.seconds))
+                    raise
+                logger.warning(strings.LOG_OUTBOUND_FLOOD_WAIT.format(seconds=e.seconds))
+                self.stats.flood_wait_seconds += e.seconds
+                self.pause(e.seconds)
+
+    async def _send(self, peer, text: str, before_send=None) -> Message:
+        message = await self._run(lambda: self.app.send_message(peer, text),
+                                  record=lambda: self.recorder.record_send(text), before_send=before_send)
+        self.stats.sends += 1
+        return message
+
+    def _forget_pending(self, key: tuple, task: asyncio.Future):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def send_message(self, peer, text: str, before_send=None) -> Message:
+        if text not in self.merge_commands:
+            return await self._send(peer, text, before_send)
+
+        key = (peer, text)
+        task = self._pending.get(key)
+        if task is not None and not task.done():
+            self.stats.merged += 1
+            logger.debug(strings.LOG_OUTBOUND_MERGED.format(message=text))
+        else:
+            task = asyncio.ensure_future(self._send(peer, text, before_send))
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._forget_pending(key, t))
+        return await asyncio.shield(task)
+
+    async def click(self, message: Message, text: str, before_send=None):
+        result = await self._run(lambda: message.click(text=text),
+                                 record=lambda: self.recorder.record_click(message, text), before_send=before_send)
+        self.stats.clicks += 1
+        return result
+
+    def describe_stats(self) -> str:
+        return strings.LOG_OUTBOUND_STATS.format(sends=self.stats.sends, clicks=self.stats.clicks,
+                                                 merged=self.stats.merged, rate=self.stats.rate_per_minute,
+                                                 last_minute=self.stats.last_minute,
+                                                 flood_waits=self.stats.flood_waits,
+                                                 flood_wait_seconds=self.stats.flood_wait_seconds)
@@ -4,9 +4,10 @@ from functools import wraps
 from telethon.tl.custom import Message
 from telethon.tl.custom.message import Message
 from .logger import logger
-from .models import strings, ActionMode
+from .models import strings, ActionMode, ShopAction, ShopOperation, ShopOperationResult, InventorySnapshot
 from .interactor import Interactor
-from .utils import get_message_text, remove_formatting
+from .parser import parse_balance, parse_booster_screen
+from .utils import get_message_text, find_button_by_text, button_labels
 
 
 def shop_action(error_log_string: str, default_return=None):
@@ -28,6 +29,10 @@ def shop_action(error_log_string: str, default_return=None):
     return decorator
 
 
+def is_unchanged(before: Message, after: Message) -> bool:
+    return after.id == before.id and get_message_text(after) == get_message_text(before)
+
+
 class ShopManager:
     def __init__(self, interactor: Interactor):
         self.interactor = interactor
@@ -107,7 +112,7 @@ class ShopManager:
                                                              button_text=action_button)
             history.append(final_msg)
 
-            if final_msg.id == msg.id:
+            if is_unchanged(msg, final_msg):
                 logger.warning(strings.LOG_SHOP_ALERT_DETECTED.format(name=booster_name))
                 await self.navigate_back(msg)
                 return "alert_response"
@@ -151,7 +156,7 @@ class ShopManager:
             result = await self.interactor.execute_action(action=ActionMode.CLICK, original_message=boosters_menu_msg,
                                                           button_text=button_to_click)
             if result and result.buttons:
-                result_text = remove_formatting(result.text)
+                result_text = get_message_text(result)
                 match = re.search(r"\[(\d+) шт]", result_text)
                 if match:
                     count = int(match.group(1))
@@ -164,6 +169,27 @@ class ShopManager:
             await self.navigate_back(boosters_menu_msg)
         return 0
 
+    @shop_action(strings.LOG_SHOP_ERROR_CHECKING_INVENTORY, default_return=None)
+    async def get_inventory_snapshot(self, include_shop: bool = False, **kwargs) -> InventorySnapshot | None:
+        history = kwargs['history']
+        logger.info(strings.LOG_SHOP_READING_INVENTORY)
+        snapshot = InventorySnapshot()
+
+        screen = await self._navigate_to_inventory_boosters(history)
+        snapshot.merge(parse_booster_screen(get_message_text(screen), button_labels(screen)))
+        await self.navigate_back(screen)
+
+        if include_shop:
+            screen = await self._navigate_to_shop_boosters(history)
+            message_text = get_message_text(screen)
+            snapshot.merge({name: info for name, info in parse_booster_screen(message_text, button_labels(screen)).items()
+                            if info.price is not None})
+            snapshot.balance = parse_balance(message_text)
+            await self.navigate_back(screen)
+
+        logger.info(strings.LOG_SHOP_INVENTORY_SNAPSHOT.format(boosters=snapshot.describe()))
+        return snapshot
+
     @shop_action(strings.LOG_SHOP_ERROR_BUYING, default_return=False)
     async def buy_booster(self, booster_name: str, **kwargs) -> bool:
         history = kwargs['history']
@@ -217,7 +243,7 @@ class ShopManager:
             )
             history.append(final_msg)
 
-            if final_msg.id == msg.id:
+            if is_unchanged(msg, final_msg):
                 logger.warning(strings.LOG_SHOP_ALERT_DETECTED.format(name=booster_name))
                 await self.navigate_back(msg)
                 return "alert_response"
@@ -236,3 +262,115 @@ class ShopManager:
             logger.warning(strings.LOG_SHOP_TIMEOUT_AFTER_CLICK.format(name=booster_name))
             await self.navigate_back(msg)
             return "alert_response"
+
+    async def _transaction_step(self, history: list, list_msg: Message, operation: ShopOperation,
+                                action_button: str, success_keyword: str,
+                                balance: int | None) -> tuple[bool | str, Message, int | None]:
+        button = find_button_by_text(list_msg, operation.booster_name)
+        if not button:
+            logger.info(strings.LOG_SHOP_BOOSTER_NOT_FOUND.format(name=operation.booster_name))
+            return False, list_msg, balance
+
+        detail_msg = await self.interactor.execute_action(ActionMode.CLICK, original_message=list_msg,
+                                                          button_text=button.text)
+        history.append(detail_msg)
+        detail_balance = parse_balance(get_message_text(detail_msg))
+        balance = detail_balance if detail_balance is not None else balance
+
+        try:
+            final_msg = await self.interactor.execute_action(ActionMode.CLICK, original_message=detail_msg,
+                                                             button_text=action_button)
+            history.append(final_msg)
+        except TimeoutError:
+            logger.warning(strings.LOG_SHOP_TIMEOUT_AFTER_CLICK.format(name=operation.booster_name))
+            final_msg = detail_msg
+
+        message_text = get_message_text(final_msg)
+        if is_unchanged(detail_msg, final_msg):
+            logger.warning(strings.LOG_SHOP_ALERT_DETECTED.format(name=operation.booster_name))
+            status = "already_active" if operation.action == ShopAction.USE else "alert_response"
+        elif message_text and success_keyword in message_text:
+            status = True
+            final_balance = parse_balance(message_text)
+            if final_balance is not None:
+                balance = final_balance
+            elif operation.action == ShopAction.BUY:
+                balance = None
+        else:
+            status = False
+
+        back_from = final_msg if find_button_by_text(final_msg, strings.BTN_BACK) else detail_msg
+        list_msg = await self.interactor.execute_action(ActionMode.CLICK, original_message=back_from,
+                                                        button_text=strings.BTN_BACK)
+        history.append(list_msg)
+        return status, list_msg, balance
+
+    async def _transaction_session(self, navigation_func, results: list[ShopOperationResult],
+                                   action_button: str, success_keyword: str, limits: dict[str, int] | None = None):
+        history = []
+        screen = None
+        try:
+            screen = await navigation_func(history)
+            message_text = get_message_text(screen)
+            balance = parse_balance(message_text)
+            if limits:
+                on_screen = InventorySnapshot(parse_booster_screen(message_text, button_labels(screen)))
+                for name in limits:
+                    info = on_screen.get(name)
+                    if info is not None and info.count is not None:
+                        limits[name] = info.count
+            for result in results:
+                result.balance = balance
+                quantity = result.operation.quantity
+                name = result.operation.booster_name
+                if limits and name in limits and limits[name] < quantity:
+                    logger.info(strings.LOG_SHOP_USE_CAPPED.format(available=limits[name], quantity=quantity,
+                                                                   name=name))
+                    quantity = limits[name]
+                for _ in range(quantity):
+                    status, screen, balance = await self._transaction_step(
+                        history, screen, result.operation, action_button, success_keyword, balance)
+                    if balance is not None:
+                        logger.debug(strings.LOG_SHOP_BALANCE_PARSED.format(coins=balance))
+                    result.status = status
+                    result.balance = balance
+                    if status is not True:
+                        break
+                    result.completed += 1
+                if limits and result.operation.booster_name in limits:
+                    limits[result.operation.booster_name] -= result.completed
+        except Exception as e:
+            logger.error(strings.LOG_SHOP_TRANSACTION_ERROR.format(e=e))
+            screen = history[-1] if history else screen
+        if screen:
+            await self.navigate_back(screen)
+
+    async def run_transaction(self, operations: list[ShopOperation],
+                              inventory: InventorySnapshot | None = None) -> list[ShopOperationResult]:
+        logger.info(strings.LOG_SHOP_TRANSACTION.format(
+            operations=", ".join(f"{op.action.name.lower()} {op.quantity}x {op.booster_name}" for op in operations)))
+        results = [ShopOperationResult(operation=op) for op in operations]
+
+        buys = [r for r in results if r.operation.action == ShopAction.BUY]
+        if buys:
+            await self._transaction_session(self._navigate_to_shop_boosters, buys,
+                                            strings.BTN_BUY, strings.KEYWORD_BOUGHT)
+
+        available, unknown = {}, set()
+        for r in buys:
+            name = r.operation.booster_name
+            info = inventory.get(name) if inventory else None
+            if info is None or info.count is None:
+                unknown.add(name)
+            available[name] = available.get(name, info.count or 0 if info else 0) + r.completed
+
+        uses = [r for r in results if r.operation.action == ShopAction.USE
+                and (r.operation.booster_name in unknown or available.get(r.operation.booster_name, 1))]
+        if uses:
+            await self._transaction_session(self._navigate_to_inventory_boosters, uses,
+                                            strings.BTN_ACTIVATE, strings.KEYWORD_ACTIVATED, limits=available)
+
+        logger.info(strings.LOG_SHOP_TRANSACTION_RESULT.format(
+            results=", ".join(f"{r.operation.booster_name}: {r.completed}/{r.operation.quantity} ({r.status})"
+                              for r in results)))
+        return results
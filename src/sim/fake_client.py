@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from telethon import events
+
+
+@dataclass
+class FakeButton:
+    text: str
+    data: bytes | None = None
+
+
+class FakeEntity:
+    def __init__(self, entity_id: int, username: str | None = None):
+        self.id = entity_id
+        self.username = username
+
+
+class FakeMessage:
+    def __init__(self, client: "FakeClient", message_id: int, text: str, chat_id: int,
+                 buttons: list[list[FakeButton]] | None = None, out: bool = False, date: datetime | None = None,
+                 formatted_text: str | None = None):
+        self._client = client
+        self.id = message_id
+        self.message = text
+        self.formatted_text = formatted_text
+        self.chat_id = chat_id
+        self.buttons = buttons or None
+        self.out = out
+        self.entities = None
+        self.date = date or datetime.now(timezone.utc)
+        self.edit_date = None
+
+    @property
+    def text(self) -> str:
+        return self.message if self.formatted_text is None else self.formatted_text
+
+    @property
+    def raw_text(self) -> str:
+        return self.message
+
+    async def click(self, text: str | None = None):
+        for row in self.buttons or []:
+            for button in row:
+                if button.text == text:
+                    return await self._client.click(self, button)
+        raise ValueError(f"Could not find any button with text '{text}'")
+
+
+class FakeEvent:
+    def __init__(self, message: FakeMessage):
+        self.message = message
+        self.chat_id = message.chat_id
+
+
+class FakeClient:
+    def __init__(self, bot_id: int = 1, bot_username: str = "KomaruCardsBot", first_message_id: int = 1):
+        self.bot = FakeEntity(bot_id, bot_username)
+        self.responder = None
+        self.history: list[FakeMessage] = []
+        self.outgoing: list[tuple[str, str]] = []
+        self.dispatched = 0
+        self.connected = False
+        self._handlers: list[tuple[type, object]] = []
+        self._ids = itertools.count(first_message_id)
+        self._disconnected = asyncio.Event()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add_event_handler(self, callback, event=None):
+        self._handlers.append((type(event), callback))
+
+    def on(self, event):
+        def decorator(callback):
+            self.add_event_handler(callback, event)
+            return callback
+        return decorator
+
+    async def start(self):
+        self.connected = True
+        return self
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def disconnect(self):
+        self.connected = False
+        self._disconnected.set()
+
+    async def run_until_disconnected(self):
+        await self._disconnected.wait()
+
+    async def get_entity(self, peer):
+        return self.bot
+
+    async def send_message(self, peer, text: str) -> FakeMessage:
+        message = FakeMessage(self, self.next_id(), text, self.bot.id, out=True)
+        self.history.append(message)
+        self.outgoing.append(("send", text))
+        if self.responder:
+            self.responder.on_message(message)
+        return message
+
+    async def click(self, message: FakeMessage, button: FakeButton):
+        self.outgoing.append(("click", button.text))
+        if self.responder:
+            self.responder.on_click(message, button)
+        return None
+
+    async def iter_messages(self, peer, limit: int | None = None, min_id: int = 0, reverse: bool = False):
+        messages = [m for m in self.history if m.id > min_id]
+        if not reverse:
+            messages.reverse()
+        for message in messages[:limit]:
+            yield message
+
+    def make_message(self, text: str, buttons: list[list[str]] | None = None, message_id: int | None = None,
+                     date: datetime | None = None, formatted_text: str | None = None) -> FakeMessage:
+        rows = [[FakeButton(label) for label in row] for row in buttons] if buttons else None
+        return FakeMessage(self, message_id or self.next_id(), text, self.bot.id, buttons=rows, date=date,
+                           formatted_text=formatted_text)
+
+    def push_new(self, message: FakeMessage):
+        self.history.append(message)
+        return asyncio.create_task(self._dispatch(events.NewMessage, message))
+
+    def push_edit(self, message: FakeMessage):
+        message.edit_date = datetime.now(timezone.utc)
+        for i, existing in enumerate(self.history):
+            if existing.id == message.id:
+                self.history[i] = message
+                break
+        return asyncio.create_task(self._dispatch(events.MessageEdited, message))
+
+    async def _dispatch(self, event_type: type, message: FakeMessage):
+        self.dispatched += 1
+        event = FakeEvent(message)
+        for handler_type, callback in list(self._handlers):
+            if handler_type is event_type:
+                await callback(event)
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import time
+from collections import Counter
+
+from ..models import strings
+from . import samples
+from .fake_client import FakeClient, FakeMessage, FakeButton
+
+
+class FakeKomaruCardsBot:
+    def __init__(self, client: FakeClient, latency: float | tuple[float, float] = 0.0, coins: int = 100,
+                 boosters: dict[str, int] | None = None, prices: dict[str, int] | None = None,
+                 cooldown_seconds: int = 0, card_names: list[str] | None = None, seed: int | None = None,
+                 headerless_ratio: float = 0.0, time_booster_reduction: int = 3600):
+        self.client = client
+        self.latency = latency
+        self.coins = coins
+        self.boosters = boosters if boosters is not None else {strings.BOOSTER_LUCK: 1, strings.BOOSTER_TIME: 1}
+        self.prices = prices or {strings.BOOSTER_LUCK: 20, strings.BOOSTER_TIME: 15}
+        self.active = {name: False for name in self.boosters}
+        self.cooldown_seconds = cooldown_seconds
+        self.time_booster_reduction = time_booster_reduction
+        self.headerless_ratio = headerless_ratio
+        self.cooldown_until = 0.0
+        self.card_names = card_names or [f"Комару #{i}" for i in range(50)]
+        self.owned: set[str] = set()
+        self.points = 0
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.activations = Counter()
+        client.responder = self
+
+    def _latency(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self.random.uniform(*self.latency)
+        return self.latency
+
+    def _respond(self, build, edit_of: FakeMessage | None = None):
+        async def respond():
+            latency = self._latency()
+            if latency:
+                await asyncio.sleep(latency)
+            reply = build()
+            if reply is None:
+                return
+            text, buttons = reply
+            if edit_of is not None:
+                self.client.push_edit(self.client.make_message(text, buttons, message_id=edit_of.id))
+            else:
+                self.client.push_new(self.client.make_message(text, buttons))
+
+        self.requests += 1
+        asyncio.create_task(respond())
+
+    def on_message(self, message: FakeMessage):
+        text = message.message
+        if text == strings.CMD_KOMARU:
+            self._respond(self._card_or_cooldown)
+        elif text == strings.CMD_PROFILE:
+            self._respond(self._profile_screen)
+        elif text == strings.CMD_SHOP:
+            self._respond(self._shop_screen)
+
+    def on_click(self, message: FakeMessage, button: FakeButton):
+        label = button.text
+        screen = message.message
+        if label == strings.BTN_INVENTORY:
+            build = self._inventory_screen
+        elif label == strings.BTN_BOOSTERS:
+            build = self._shop_boosters_screen if screen.startswith("🛒") else self._inventory_boosters_screen
+        elif label == strings.BTN_BACK:
+            build = self._back_from(screen)
+        elif label in (strings.BTN_BUY, strings.BTN_ACTIVATE):
+            name = self._booster_on_screen(screen)
+            action = self._buy if label == strings.BTN_BUY else self._activate
+            self._respond(lambda: action(name), edit_of=message)
+            return
+        else:
+            name = next((n for n in self.boosters if label.startswith(n)), None)
+            if name is None:
+                return
+            if screen.startswith("🛒"):
+                build = lambda: self._shop_detail_screen(name)
+            else:
+                build = lambda: self._inventory_detail_screen(name)
+        self._respond(build, edit_of=message)
+
+    def _booster_on_screen(self, screen: str) -> str:
+        return next(n for n in self.boosters if n in screen.split("\n", 1)[0])
+
+    def _back_from(self, screen: str):
+        header = screen.split("\n", 1)[0]
+        if header.startswith("🛒 ") and any(n in header for n in self.boosters):
+            return self._shop_boosters_screen
+        if header.startswith("🛒"):
+            return self._shop_screen
+        if any(n in header for n in self.boosters) or strings.KEYWORD_ACTIVATED in header:
+            return self._inventory_boosters_screen
+        if header.startswith(strings.BTN_BOOSTERS):
+            return self._inventory_screen
+        return self._profile_screen
+
+    def _card_or_cooldown(self):
+        now = time.monotonic()
+        if now < self.cooldown_until:
+            return samples.cooldown_message(int(self.cooldown_until - now) + 1), None
+        self.cooldown_until = now + self.cooldown_seconds
+        self.active[strings.BOOSTER_LUCK] = False
+        name = self.random.choice(self.card_names)
+        duplicate = name in self.owned
+        self.owned.add(name)
+        self.coins += 3
+        self.points += 1000
+        with_header = not self.headerless_ratio or self.random.random() >= self.headerless_ratio
+        return samples.card_message(name, "Редкая", self.coins, self.points, duplicate=duplicate,
+                                    with_header=with_header), None
+
+    def _profile_screen(self):
+        return samples.profile_message(self.coins), [[strings.BTN_INVENTORY]]
+
+    def _inventory_screen(self):
+        return f"{strings.BTN_INVENTORY}\n\nКарточек • {len(self.owned)}", [[strings.BTN_BOOSTERS], [strings.BTN_BACK]]
+
+    def _inventory_boosters_screen(self):
+        lines = [f"{name} • {count} шт." + (" (активен)" if self.active.get(name) else "")
+                 for name, count in self.boosters.items()]
+        buttons = [[f"{name} ({count})"] for name, count in self.boosters.items() if count > 0]
+        return f"{strings.BTN_BOOSTERS}\n\n" + "\n".join(lines), buttons + [[strings.BTN_BACK]]
+
+    def _inventory_detail_screen(self, name: str):
+        return f"{name}\n\nВ наличии: [{self.boosters[name]} шт]", [[strings.BTN_ACTIVATE], [strings.BTN_BACK]]
+
+    def _shop_screen(self):
+        return f"🛒 Магазин\n\n💰 {strings.KEYWORD_COINS_TEXT} • {self.coins:,}", [[strings.BTN_BOOSTERS]]
+
+    def _shop_boosters_screen(self):
+        lines = [f"{name} • {price} 💰" for name, price in self.prices.items()]
+        buttons = [[f"{name} • {price} 💰"] for name, price in self.prices.items()]
+        return (f"🛒 {strings.BTN_BOOSTERS}\n\n💰 {strings.KEYWORD_COINS_TEXT} • {self.coins:,}\n\n" + "\n".join(lines),
+                buttons + [[strings.BTN_BACK]])
+
+    def _shop_detail_screen(self, name: str):
+        return (f"🛒 {name}\n\nЦена • {self.prices[name]} 💰\n💰 {strings.KEYWORD_COINS_TEXT} • {self.coins:,}",
+                [[strings.BTN_BUY], [strings.BTN_BACK]])
+
+    def _buy(self, name: str):
+        if self.coins < self.prices[name]:
+            return None
+        self.coins -= self.prices[name]
+        self.boosters[name] = self.boosters.get(name, 0) + 1
+        return (f"🛒 {name}\n\nБустер {strings.KEYWORD_BOUGHT}!\n💰 {strings.KEYWORD_COINS_TEXT} • {self.coins:,}",
+                [[strings.BTN_BACK]])
+
+    def _activate(self, name: str):
+        if self.active.get(name) or not self.boosters.get(name):
+            return None
+        self.boosters[name] -= 1
+        self.activations[name] += 1
+        if name == strings.BOOSTER_TIME:
+            self.cooldown_until = max(time.monotonic(), self.cooldown_until - self.time_booster_reduction)
+            return samples.COOLDOWN_REDUCED, [[strings.BTN_BACK]]
+        self.active[name] = True
+        return f"{name}\n\nБустер {strings.KEYWORD_ACTIVATED}!", [[strings.BTN_BACK]]
@@ -0,0 +1,73 @@
+NEW_CARD = """🌟 Карточка «Комару в своем бассейне» ваша!
+
+💎 Редкость • Редкая
+✨ Очки • +3,000 [339,000]
+💰 Монеты • +7 [1,693]
+⚡️ Бустер «удача» помог вам получить эту карточку
+
+🎉 Бонусная карточка каждые 12 часов с командой /bonus"""
+
+DUPLICATE_CARD = """🔄 Карточка «Много комару» уже у вас!
+
+💎 Редкость • Редкая
+✨ Очки • 3,000 [336,000]
+💰 Монеты • +3 [1,686]
+⚡️ Бустер «удача» помог вам получить эту карточку
+
+Будут начислены только очки
+
+🎁 Получай карточку раз в 12 часов с /bonus!"""
+
+PROFILE = """👤 Профиль «Комару»
+
+💰 Монеты • 1,693
+✨ Очки • 339,000
+🃏 Карточек • 57"""
+
+COOLDOWN = "⏳ Подождите 2ч. 15мин. 30сек. перед следующей попыткой"
+
+COOLDOWN_REDUCED = "⚡️ Бустер «ускоритель времени» активирован! Время ожидания уменьшено."
+
+UNKNOWN = "Привет! Я бот с карточками Комару."
+
+FORMATTED_NEW_CARD = NEW_CARD.replace("«Комару в своем бассейне»", "**«Комару в своем бассейне»**") \
+    .replace("Редкая", "__Редкая__").replace("[339,000]", "`[339,000]`")
+
+MESSAGES = {
+    "new_card": NEW_CARD,
+    "duplicate_card": DUPLICATE_CARD,
+    "profile": PROFILE,
+    "cooldown": COOLDOWN,
+    "cooldown_reduced": COOLDOWN_REDUCED,
+    "unknown": UNKNOWN,
+}
+
+
+def card_message(name: str, rarity: str, coins: int, points: int, duplicate: bool = False,
+                 with_header: bool = True) -> str:
+    if not with_header:
+        header = f"Карточка «{name}»"
+    elif duplicate:
+        header = f"🔄 Карточка «{name}» уже у вас!"
+    else:
+        header = f"🌟 Карточка «{name}» ваша!"
+    return (f"{header}\n\n"
+            f"💎 Редкость • {rarity}\n"
+            f"✨ Очки • +1,000 [{points:,}]\n"
+            f"💰 Монеты • +3 [{coins:,}]\n\n"
+            f"🎁 Получай карточку раз в 12 часов с /bonus!")
+
+
+def cooldown_message(seconds: int) -> str:
+    h, m, s = seconds // 3600, (seconds % 3600) // 60, seconds % 60
+    parts = []
+    if h:
+        parts.append(f"{h}ч.")
+    if h or m:
+        parts.append(f"{m}мин.")
+    parts.append(f"{s}сек.")
+    return f"⏳ Подождите {' '.join(parts)} перед следующей попыткой"
+
+
+def profile_message(coins: int) -> str:
+    return f"👤 Профиль «Комару»\n\n💰 Монеты • {coins:,}\n✨ Очки • 339,000"
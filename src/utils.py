@@ -4,10 +4,25 @@ import random
 from telethon.tl.custom import Button
 from telethon.tl.custom.message import Message
 
-def get_message_text(message: Message) -> str | None:
+_delay_scale = 1.0
+_zero_width_pattern = re.compile("[\u200b\u2060\ufeff]")
+
+class CleanText(str):
+    __slots__ = ()
+
+def normalize_text(text: str) -> CleanText:
+    return text if isinstance(text, CleanText) else CleanText(_zero_width_pattern.sub('', text))
+
+def get_message_text(message: Message) -> CleanText | None:
     if not message:
         return None
-    return message.text
+    raw = message.raw_text or ""
+    cached = getattr(message, "_clean_text", None)
+    if cached is not None and cached[0] is raw:
+        return cached[1]
+    text = normalize_text(raw)
+    message._clean_text = (raw, text)
+    return text
 
 def clean_and_convert_to_int(s: str) -> int:
     return int(s.replace(',', '').replace(' ', ''))
@@ -25,5 +40,15 @@ def find_button_by_text(message: Message, text: str) -> Button | None:
                 return button
     return None
 
+def button_labels(message: Message) -> list[str]:
+    if not message or not message.buttons:
+        return []
+    return [button.text for row in message.buttons for button in row]
+
+
+def set_delay_scale(scale: float):
+    global _delay_scale
+    _delay_scale = scale
+
 async def human_delay(min_sec=0.6, max_sec=3.2):
-    await asyncio.sleep(random.uniform(min_sec, max_sec))
+    await asyncio.sleep(random.uniform(min_sec, max_sec) * _delay_scale)